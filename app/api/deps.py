@@ -1,51 +1,129 @@
+from dataclasses import dataclass
 from fastapi import Request, Depends, HTTPException, status
 from jose import jwt
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.services.auth_service import decode_token
-from app.core.database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.auth_service import decode_token, decode_token_async
+from app.core.config import settings
+from app.core import database
+from app.middleware.read_your_writes import wrote_recently
+from app.utils.cache import TTLCache
 
 from app.models.user import User
 
 
 # DB DEPENDENCY
 def get_db():
-    if SessionLocal is None:
+    if database.SessionLocal is None:
         raise HTTPException(
             status_code=503,
             detail="Database not configured. Please check DATABASE_URL environment variable."
         )
-    db = SessionLocal()
+    db = database.SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
-def get_current_user(request: Request, db: Session):
+async def get_async_db():
+    if database.AsyncSessionLocal is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Database not configured. Please check DATABASE_URL environment variable."
+        )
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+# Read-only routes. A client that wrote within READ_YOUR_WRITES_SECONDS keeps
+# reading from the primary, so a lagging replica never hides its own changes.
+# The primary session comes through Depends so it is the same one role_required
+# gets: a second session would wait for the serverless pool's only connection.
+# Sessions check out a connection on first use, so it costs nothing unused.
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    if database.AsyncReadSessionLocal is None or wrote_recently(request):
+        yield primary
+        return
+    async with database.AsyncReadSessionLocal() as db:
+        yield db
+
+def get_access_token(request: Request):
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Could not validate credentials")
+    return token
+
+def get_user_id_from_request(request: Request):
+    return get_user_id_from_payload(decode_token(get_access_token(request)))
 
-    payload = decode_token(token)
+# Also checks the shared revocation table when this process has not synced lately
+async def get_user_id_from_request_async(request: Request):
+    return get_user_id_from_payload(await decode_token_async(get_access_token(request)))
+
+def get_user_id_from_payload(payload: dict):
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Could not validate credentials")
     try:
-        user_id = int(user_id)
+        return int(user_id)
     except (ValueError, TypeError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Could not validate credentials")
+
+def get_current_user(request: Request, db: Session):
+    user_id = get_user_id_from_request(request)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Could not validate credentials")
     return user
 
+# PRINCIPAL CACHE
+# Authenticated routes only need who the caller is, so the user row is reduced
+# to a Principal and cached by user id. Entries are dropped when the user logs
+# out or an admin changes them, and expire after PRINCIPAL_CACHE_TTL_SECONDS
+# so changes made by other workers are picked up too.
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    role: str
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+def invalidate_principal(user_id: int):
+    principal_cache.pop(user_id)
+
+async def get_current_user_async(request: Request, db: AsyncSession):
+    user_id = await get_user_id_from_request_async(request)
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    started_transaction = not db.in_transaction()
+    result = await db.execute(select(User.id, User.username, User.role).where(User.id == user_id))
+    row = result.first()
+    if started_transaction:
+        # Give the connection back now rather than when the request ends: a
+        # streamed response (the user export) would otherwise hold the only
+        # serverless connection while it opens its own session.
+        await db.commit()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Could not validate credentials")
+    principal = Principal(id=row.id, username=row.username, role=row.role)
+    principal_cache.set(user_id, principal)
+    return principal
+
 def role_required(role: str):
-    def check(request: Request, db: Session = Depends(get_db)):
-        current_user = get_current_user(request, db)
+    async def check(request: Request, db: AsyncSession = Depends(get_async_db)):
+        current_user = await get_current_user_async(request, db)
         if current_user.role != role:
             raise HTTPException(status_code=403, detail="Admin Can Only Access")
         return current_user
-    return check
\ No newline at end of file
+    return check
@@ -1,98 +1,195 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form , Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Form , Request , Query
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.CRUD import create_user , update_user
-from app.middleware.rate_limit import limiter
+from app.middleware.rate_limit import limiter, get_remote_address
+from app.services.login_guard import login_guard
+from app.middleware.read_your_writes import wrote_recently
+from app.core.config import settings
+from app.utils.pagination import paginate
 # Dependancy
-from app.api.deps import get_db , get_current_user , role_required
+from app.api.deps import get_async_db , get_read_db , get_current_user_async , role_required , get_user_id_from_request , invalidate_principal
 
 # DATA MODEL
 from app.models.user import User
 from app.models.post import Post
 
 # SECURITY
-from app.core.security import hash_password, verify_password
+from app.utils.hashing import hashing_executor
 
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import asyncio
+import time
 
-from app.schemas.user import UserBase, UserLogin, PostBase, UserUpdate
-from app.services.auth_service import create_access_token , create_refresh_token , decode_token
+from app.schemas.user import UserBase, UserLogin, PostBase, UserUpdate, PostOut, PostPage, PostDetail, UserOut, UserPage
+from app.services.auth_service import create_token_pair , new_token_family , revoke_token , rotate_refresh_token
+from app.services.feed_cache import feed_cache
+from app.services import post_search
+from app.middleware.metrics import metrics
+from app.core import database
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post('/register')
-async def register(user: UserBase, db: Session = Depends(get_db)):
-    exists = db.query(User).filter(User.username == user.username).first()
+@limiter.limit(settings.RATE_LIMIT_REGISTER)
+async def register(user: UserBase, request: Request, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).where(User.username == user.username))
+    exists = result.scalars().first()
     if exists:
         raise HTTPException(status_code=400, detail="Username already exists")
     
     # Create user directly
-    hash_pwd = hash_password(user.password)
+    hash_pwd = await hashing_executor.hash(user.password)
     new_user = User(username=user.username, email=user.email, hashed_password=hash_pwd, role=user.role)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     return {"message": "success"}
 
 @router.post('/login')
-@limiter.limit("5/minute")
-async def login(user: UserLogin, request: Request, db: Session = Depends(get_db)):
-    user_email = db.query(User).filter(User.email == user.email).first()
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
+async def login(user: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Locked-out accounts and IPs are turned away before the lookup and bcrypt
+    client_ip = get_remote_address(request)
+    login_guard.check(user.email, client_ip)
+
+    result = await db.execute(select(User).where(User.email == user.email))
+    user_email = result.scalars().first()
     if not user_email:
-        raise HTTPException(status_code=400, detail="Email does not exist")
+        # Same bcrypt cost and same answer as a wrong password: no account enumeration
+        await login_guard.dummy_verify(user.password)
+        login_guard.record_failure(user.email, client_ip)
+        raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    if not verify_password(user.password, user_email.hashed_password):
-        raise HTTPException(status_code=400, detail="Incorrect password")
+    if not await hashing_executor.verify(user.password, user_email.hashed_password):
+        login_guard.record_failure(user.email, client_ip)
+        raise HTTPException(status_code=400, detail="Invalid email or password")
+    login_guard.record_success(user.email)
 
     #Set session
     request.session["user_id"] = user_email.id
 
-    access_token = create_access_token({"sub": str(user_email.id) , "type":"access"})
-    refresh_token = create_refresh_token({"sub": str(user_email.id) , "type":"refresh"})
+    access_token, refresh_token = create_token_pair(user_email.id, new_token_family())
     response = JSONResponse(status_code=201, content={"message": "Login successful"})
     response.set_cookie("access_token", access_token, httponly=True,samesite="lax")
     response.set_cookie("refresh_token", refresh_token, httponly=True,samesite="lax")
     return response
 
+@router.post('/refresh')
+async def refresh(request: Request):
+    get_refresh_token = request.cookies.get("refresh_token")
+    if not get_refresh_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        access_token, refresh_token = await rotate_refresh_token(get_refresh_token)
+    except HTTPException as e:
+        # Clear the dead cookies so the client goes back to the login page
+        response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+        response.delete_cookie("access_token")
+        response.delete_cookie("refresh_token")
+        return response
+    response = JSONResponse(status_code=200, content={"message": "Token refreshed"})
+    response.set_cookie("access_token", access_token, httponly=True,samesite="lax")
+    response.set_cookie("refresh_token", refresh_token, httponly=True,samesite="lax")
+    return response
+
+# Who the caller is, so the frontend can mark its own posts without listing them
+@router.get('/me')
+async def me(request: Request, db: AsyncSession = Depends(get_read_db)):
+    current = await get_current_user_async(request, db)
+    return {"id": current.id, "username": current.username, "role": current.role}
+
 @router.post('/post_upload')
-async def post_upload(post: PostBase, request: Request, db: Session = Depends(get_db)):
-    current = get_current_user(request,db)
-    new_post = Post(title=post.title, content=post.content, author=current.username)
+@limiter.limit(settings.RATE_LIMIT_POST_UPLOAD)
+async def post_upload(post: PostBase, request: Request, db: AsyncSession = Depends(get_async_db)):
+    current = await get_current_user_async(request, db)
+    new_post = Post(title=post.title, content=post.content, author=current.username, user_id=current.id)
     db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    await db.commit()
+    feed_cache.invalidate()
 
     response = JSONResponse(status_code=201, content={"message": "Upload successful"})
     return response
 
-@router.get('/get-post')
-async def get_posts(request:Request ,db: Session = Depends(get_db)):
-    current = get_current_user(request,db)
-    post = db.query(Post).filter(Post.author == current.username).all()
-    return post if post else []
-
-@router.get('/feed')
-async def get_feed(request:Request ,db: Session = Depends(get_db)):
-    current = get_current_user(request,db)
-    posts = db.query(Post).order_by(Post.id.desc()).all()
-    return posts
-
-@router.get('/post/{id}')
-async def get_post( request:Request,id: int, db: Session = Depends(get_db)):
-    current = get_current_user(request,db)
-    get_post_specific = db.query(Post).filter(Post.id == id, Post.author == current.username).first()
+PageLimit = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX)
+
+# Only the columns the response models expose, fetched as Rows without building ORM objects
+POST_OUT_COLUMNS = tuple(getattr(Post, name) for name in PostOut.model_fields)
+USER_OUT_COLUMNS = tuple(getattr(User, name) for name in UserOut.model_fields)
+
+@router.get('/get-post', response_model=PostPage)
+async def get_posts(
+    request:Request,
+    limit: int = PageLimit,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    current = await get_current_user_async(request, db)
+    posts, next_cursor = await paginate(db, select(*POST_OUT_COLUMNS).where(Post.user_id == current.id), Post.id, limit, cursor)
+    return {"items": posts, "next_cursor": next_cursor}
+
+@router.get('/feed', response_model=PostPage)
+async def get_feed(
+    request:Request,
+    limit: int = PageLimit,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    current = await get_current_user_async(request, db)
+    if cursor:
+        posts, next_cursor = await paginate(db, select(*POST_OUT_COLUMNS), Post.id, limit, cursor)
+        return {"items": posts, "next_cursor": next_cursor}
+
+    # First page: served from the feed cache, or 304 if the client already has it.
+    # A client that just wrote skips the cache, which may hold a page built before its write.
+    page = None if wrote_recently(request) else feed_cache.get(limit)
+    if page is None:
+        version = feed_cache.version
+        start = time.perf_counter()
+        posts, next_cursor = await paginate(db, select(*POST_OUT_COLUMNS), Post.id, limit)
+        serialize_start = time.perf_counter()
+        body = PostPage.model_validate({"items": posts, "next_cursor": next_cursor}).model_dump_json().encode("utf-8")
+        metrics.observe_segment("serialization", time.perf_counter() - serialize_start)
+        page = feed_cache.store(limit, body, version, time.perf_counter() - start)
+
+    headers = {"ETag": page.etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if page.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        feed_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+@router.get('/posts/search', response_model=PostPage)
+async def search_posts(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = PageLimit,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    current = await get_current_user_async(request, db)
+    posts, next_cursor = await post_search.search_posts(db, q, limit, cursor)
+    return {"items": posts, "next_cursor": next_cursor}
+
+@router.get('/post/{id}', response_model=PostDetail)
+async def get_post( request:Request,id: int, db: AsyncSession = Depends(get_read_db)):
+    current = await get_current_user_async(request, db)
+    result = await db.execute(select(*POST_OUT_COLUMNS).where(Post.id == id, Post.user_id == current.id))
+    get_post_specific = result.first()
     if not get_post_specific:
         raise HTTPException(status_code=404, detail="Post not found")
     response = {"post": get_post_specific}
     return response
 
 @router.delete('/post/{id}')
-async def delete_post(id: int, request: Request, db: Session = Depends(get_db)):
-    current = get_current_user(request, db)
-    post = db.query(Post).filter(Post.id == id, Post.author == current.username).first()
+async def delete_post(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    current = await get_current_user_async(request, db)
+    result = await db.execute(select(Post).where(Post.id == id, Post.user_id == current.id))
+    post = result.scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
+    feed_cache.invalidate()
     response = JSONResponse(status_code=204, content={"message": "Post deleted"})
     return response
 
@@ -101,28 +198,35 @@ async def admin_panel(
     user_name: str,
     request: Request,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin = Depends(role_required("admin"))
 ):
     # Find target user by username
-    target_user = db.query(User).filter(User.username == user_name).first()
+    result = await db.execute(select(User).where(User.username == user_name))
+    target_user = result.scalars().first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Update fields directly
-    if user_update.username:
+    if user_update.username and user_update.username != target_user.username:
         target_user.username = user_update.username
+        # Keep the display name on the user's posts in step with the rename
+        await db.execute(
+            update(Post).where(Post.user_id == target_user.id).values(author=user_update.username)
+        )
     if user_update.email:
         target_user.email = user_update.email
     if user_update.password:
-        target_user.hashed_password = hash_password(user_update.password)
+        target_user.hashed_password = await hashing_executor.hash(user_update.password)
     if user_update.role:
         if admin.role != "admin":
             raise HTTPException(status_code=403, detail="Only admin can update roles")
         target_user.role = user_update.role
     
-    db.commit()
-    db.refresh(target_user)
+    # expire_on_commit is off, so target_user still holds the values just written
+    await db.commit()
+    invalidate_principal(target_user.id)
+    feed_cache.invalidate()
     
     updated = {
         "message": "update success",
@@ -141,43 +245,92 @@ async def admin_panel(
 
 
 
-BLACK_LIST_TOKEN = set()
-BLACK_LIST_RETOKEN = set()
+@router.get('/admin/users', response_model=UserPage)
+async def get_all_users(
+    request: Request,
+    limit: int = PageLimit,
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    admin = Depends(role_required("admin"))
+):
+    users, next_cursor = await paginate(db, select(*USER_OUT_COLUMNS), User.id, limit, cursor, descending=False)
+    return {"items": users, "next_cursor": next_cursor}
+
+# Totals for the admin panel: one aggregate query instead of paging through every user
+@router.get('/admin/users/stats')
+async def get_user_stats(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    admin = Depends(role_required("admin"))
+):
+    result = await db.execute(select(User.role, func.count()).group_by(User.role))
+    by_role = {role: count for role, count in result.all()}
+    return {"total": sum(by_role.values()), "by_role": by_role}
+
+@router.get('/admin/users/export')
+async def export_users(
+    request: Request,
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    admin = Depends(role_required("admin"))
+):
+    if database.AsyncSessionLocal is None:
+        raise HTTPException(status_code=503, detail="Database not configured. Please check DATABASE_URL environment variable.")
+    # Admin-only and rare: imported here so the cold start does not pay for it
+    from app.services.user_export import EXPORT_FORMATS, stream_users
+    return StreamingResponse(
+        stream_users(format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+@router.post('/admin/users/import')
+async def import_users(
+    request: Request,
+    format: str = Query(default="csv", pattern="^(csv|ndjson)$"),
+    admin = Depends(role_required("admin"))
+):
+    if database.SessionLocal is None:
+        raise HTTPException(status_code=503, detail="Database not configured. Please check DATABASE_URL environment variable.")
+    from app.core.user_import import run_import
+    try:
+        data = (await request.body()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8")
 
-@router.get('/admin/users')
-async def get_all_users(request: Request, db: Session = Depends(get_db), admin = Depends(role_required("admin"))):
-    users = db.query(User).all()
-    return [{
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "role": user.role
-    } for user in users]
+    # Hashing and the batched inserts are blocking work, keep them off the event loop.
+    # Never fork the server for the hashing pool: spawned workers start from a clean interpreter
+    return await asyncio.to_thread(
+        run_import, data, format,
+        workers=settings.BULK_IMPORT_WORKERS,
+        max_rows=settings.BULK_IMPORT_MAX_ROWS,
+        start_method="spawn",
+    )
 
-@router.get('/admin/user/{user_name}')
-async def get_userinfo(user_name: str, request: Request, db: Session = Depends(get_db), admin = Depends(role_required("admin"))):
-    target_user = db.query(User).filter(User.username == user_name).first()
+@router.get('/admin/user/{user_name}', response_model=UserOut)
+async def get_userinfo(user_name: str, request: Request, db: AsyncSession = Depends(get_read_db), admin = Depends(role_required("admin"))):
+    result = await db.execute(select(*USER_OUT_COLUMNS).where(User.username == user_name))
+    target_user = result.first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return {
-        "id": target_user.id,
-        "username": target_user.username,
-        "email": target_user.email,
-        "role": target_user.role
-    }
+    return target_user
 
 
 @router.post('/logout')
-async def logout(request:Request, db: Session = Depends(get_db)):
+async def logout(request:Request):
     get_access_token = request.cookies.get("access_token")
     if not get_access_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    BLACK_LIST_TOKEN.add(get_access_token)
+    try:
+        invalidate_principal(get_user_id_from_request(request))
+    except HTTPException:
+        pass  # Expired or invalid token, nothing cached for it
     get_refresh_token = request.cookies.get("refresh_token")
     if not get_refresh_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    BLACK_LIST_RETOKEN.add(get_refresh_token)
+    await revoke_token(get_access_token)
+    # Also revokes access tokens handed out by earlier refreshes of this login
+    await revoke_token(get_refresh_token, family=True)
     response = JSONResponse(status_code=200, content={"message": "Logout successful"})
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
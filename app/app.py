@@ -1,47 +1,32 @@
-import uvicorn
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from slowapi.middleware import SlowAPIMiddleware
 from app.core.config import settings
 from app.api.v1 import auth
-from app.core.database import Base, engine
-from app.middleware.rate_limit import limiter
+from app.middleware.rate_limit import limiter, RateLimitExceeded
+from app.exceptions.handlers import hashing_queue_full_handler, rate_limit_exceeded_handler
+from app.utils.hashing import HashingQueueFull, hashing_executor
+from app.utils.static_assets import StaticAssets
+from app.api.deps import principal_cache
+from app.services.token_revocation import revocation_store
+from app.services.feed_cache import feed_cache
+from app.services.login_guard import login_guard
+from app.services.keyring import keyring
+from app.services.auth_service import token_cache
+from app.services.health import health_monitor
+from app.middleware.metrics import MetricsMiddleware, metrics
+from app.middleware.query_timing import QueryTimingMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.core.database import pool_stats
 import os
 
-# Import models to register them with Base before creating tables
-try:
-    from app.models.user import User
-    from app.models.post import Post
-except Exception as e:
-    print(f"Warning: Could not import models: {e}")
-
-# Create tables - handle both serverless and non-serverless
-# This is done lazily - won't fail app startup if DB is unavailable
-def init_database():
-    try:
-        if engine is None:
-            print("Database engine not configured - skipping table creation")
-            return
-        Base.metadata.create_all(bind=engine, checkfirst=True)
-        print("Database tables initialized successfully")
-    except Exception as e:
-        # Log error but don't fail the app startup
-        # Database will be initialized on first request
-        print(f"Database initialization deferred (will retry on first request): {e}")
-
-# Try to initialize, but don't block app startup
-try:
-    init_database()
-except Exception as e:
-    print(f"Database initialization skipped: {e}")
-    pass  # Will be retried on first database request
+# Schema changes are applied by the migration runner as a deploy step
+# (python -m app.migrations.runner upgrade), never at import or startup.
 
 app = FastAPI(title="FastAPI", version="1.0")
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+app.add_exception_handler(HashingQueueFull, hashing_queue_full_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 # CORS configuration - update origins for production
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",") if os.getenv("ALLOWED_ORIGINS") else ["*"]
 
@@ -58,94 +43,124 @@ app.add_middleware(
     https_only=os.getenv("VERCEL") is not None,  # HTTPS only in production
     same_site="lax",
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(QueryTimingMiddleware)
+# Outermost, so the measured latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
 
-# Serve static files
-static_dir = os.path.join(os.path.dirname(__file__), "templates", "static")
-if os.path.exists(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+metrics.register_collector("hashing", hashing_executor.metrics)
+metrics.register_collector("principal_cache", principal_cache.stats)
+metrics.register_collector("revocation", revocation_store.stats)
+metrics.register_collector("feed_cache", feed_cache.stats)
+metrics.register_collector("rate_limit", limiter.stats)
+metrics.register_collector("login_guard", login_guard.stats)
+metrics.register_collector("token_cache", token_cache.stats)
+metrics.register_collector("db_pool", pool_stats)
+metrics.register_collector("health", health_monitor.stats)
 
-# Serve HTML files
+# Serve static files and HTML pages from memory (app/utils/static_assets.py)
 templates_dir = os.path.join(os.path.dirname(__file__), "templates")
+static_dir = os.path.join(templates_dir, "static")
+static_assets = StaticAssets(templates_dir, static_dir, reload=settings.STATIC_RELOAD)
+metrics.register_collector("static", static_assets.stats)
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_file(path: str, request: Request):
+    response = static_assets.file(request, path)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return response
 
 @app.get("/")
-async def read_root():
-    html_path = os.path.join(templates_dir, "index.html")
-    if os.path.exists(html_path):
-        return FileResponse(html_path)
-    return {"message": "Welcome to FastAPI"}
+async def read_root(request: Request):
+    return static_assets.page(request, "index.html") or {"message": "Welcome to FastAPI"}
 
 @app.get("/login")
-async def login_page():
-    html_path = os.path.join(templates_dir, "login.html")
-    if os.path.exists(html_path):
-        return FileResponse(html_path)
-    return {"message": "Login page"}
+async def login_page(request: Request):
+    return static_assets.page(request, "login.html") or {"message": "Login page"}
 
 @app.get("/register")
-async def register_page():
-    html_path = os.path.join(templates_dir, "register.html")
-    if os.path.exists(html_path):
-        return FileResponse(html_path)
-    return {"message": "Register page"}
+async def register_page(request: Request):
+    return static_assets.page(request, "register.html") or {"message": "Register page"}
 
 @app.get("/feed-page")
-async def feed_page():
-    html_path = os.path.join(templates_dir, "feed.html")
-    if os.path.exists(html_path):
-        return FileResponse(html_path)
-    return {"message": "Feed page"}
+async def feed_page(request: Request):
+    return static_assets.page(request, "feed.html") or {"message": "Feed page"}
 
 @app.get("/admin-panel")
-async def admin_panel_page():
-    html_path = os.path.join(templates_dir, "admin-panel.html")
-    if os.path.exists(html_path):
-        return FileResponse(html_path)
-    return {"message": "Admin panel page"}
+async def admin_panel_page(request: Request):
+    return static_assets.page(request, "admin-panel.html") or {"message": "Admin panel page"}
 
 app.include_router(auth.router)
 
+@app.on_event("startup")
+async def start_revocation_sync():
+    revocation_store.start()
+
+@app.on_event("startup")
+async def start_health_monitor():
+    health_monitor.start()
+
+@app.on_event("shutdown")
+async def shutdown_hashing_executor():
+    hashing_executor.shutdown()
+
+@app.on_event("shutdown")
+async def stop_revocation_sync():
+    await revocation_store.stop()
+
+@app.on_event("shutdown")
+async def stop_health_monitor():
+    await health_monitor.stop()
+
+# Liveness probe: the process is up and serving, no I/O
+@app.get("/livez", include_in_schema=False)
+async def livez():
+    return PlainTextResponse("ok")
+
+# Readiness probe: the latest background database check (app/services/health.py)
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    database = health_monitor.snapshot()
+    ready = health_monitor.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "database": database},
+        headers={"Cache-Control": "no-store"},
+    )
+
 # Health check endpoint for debugging
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify app is running"""
-    db_status = "unknown"
-    db_error = None
-    env_vars = {}
-    
-    try:
-        # Check environment variables
-        env_vars = {
-            "DATABASE_URL_set": bool(os.getenv("DATABASE_URL")),
-            "SECRET_KEY_set": bool(os.getenv("SECRET_KEY")),
-            "VERCEL": os.getenv("VERCEL", "not set")
-        }
-        
-        # Check database connection
-        from app.core.database import engine, DATABASE_URL
-        if engine is None:
-            db_status = "engine_not_created"
-            db_error = "Database engine is None - check DATABASE_URL format"
-        else:
-            # Try a simple database connection test
-            from sqlalchemy import text
-            with engine.connect() as conn:
-                result = conn.execute(text("SELECT 1"))
-                result.fetchone()
-            db_status = "connected"
-    except Exception as e:
-        db_status = "error"
-        db_error = str(e)
-        import traceback
-        db_error += f"\n{traceback.format_exc()}"
-    
+    env_vars = {
+        "DATABASE_URL_set": bool(os.getenv("DATABASE_URL")),
+        "SECRET_KEY_set": bool(os.getenv("SECRET_KEY")),
+    }
+    # Reported from the background check: only the very first call waits for it
+    await health_monitor.first_check()
+    database = health_monitor.snapshot()
+
     return {
         "status": "ok",
         "app_running": True,
         "database": {
-            "status": db_status,
-            "error": db_error,
-            "url_preview": os.getenv("DATABASE_URL", "")[:50] + "..." if os.getenv("DATABASE_URL") else "not set"
+            "status": database["status"],
+            "error": database["error"],
         },
         "environment": env_vars
     }
 
+# Public signing keys, for services that verify our tokens themselves
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks(request: Request):
+    headers = {"ETag": keyring.jwks_etag, "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"}
+    if request.headers.get("if-none-match") == keyring.jwks_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=keyring.jwks_body, media_type="application/json", headers=headers)
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
@@ -11,6 +11,81 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+    # Asymmetric JWT signing (ALGORITHM=ES256 or RS256); see app/services/keyring.py
+    JWT_PRIVATE_KEY: str = os.getenv("JWT_PRIVATE_KEY", "")
+    JWT_KEY_ID: str = os.getenv("JWT_KEY_ID", "")
+    JWT_VERIFY_KEYS: str = os.getenv("JWT_VERIFY_KEYS", "")
+    JWKS_MAX_AGE_SECONDS: int = int(os.getenv("JWKS_MAX_AGE_SECONDS", "300"))
+
+    # Connection pool and driver profile: "serverless", "server" or "test" (see app/core/database.py)
+    DEPLOYMENT_PROFILE: str = os.getenv("DEPLOYMENT_PROFILE", "serverless" if os.getenv("VERCEL") else "server")
+
+    # Optional read-only engine for read routes (replica URL, or a WAL reader locally with SQLite)
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL", "")
+    DATABASE_READ_POOL_SIZE: int = int(os.getenv("DATABASE_READ_POOL_SIZE", "5"))
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+    # Readiness probe: background database check (see app/services/health.py)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+    HEALTH_CHECK_MAX_STALENESS_SECONDS: float = float(os.getenv("HEALTH_CHECK_MAX_STALENESS_SECONDS", "30"))
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+    # Re-read templates and static files when they change on disk (development only)
+    STATIC_RELOAD: bool = os.getenv("STATIC_RELOAD", "false").lower() == "true"
+
+    # Password hashing executor ("thread" or "process")
+    HASH_EXECUTOR: str = os.getenv("HASH_EXECUTOR", "thread")
+    HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+    HASH_QUEUE_SIZE: int = int(os.getenv("HASH_QUEUE_SIZE", "32"))
+    HASH_RETRY_AFTER_SECONDS: int = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+
+    # Per-process cache of authenticated users (id, username, role)
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+
+    # Per-process cache of verified JWT payloads (0 disables)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+    # Token revocation ("memory" per process, or "database" shared through the revoked_token table)
+    REVOCATION_BACKEND: str = os.getenv("REVOCATION_BACKEND", "memory")
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+    REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+
+    # Keyset pagination for list endpoints
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", "200"))
+    # /auth/posts/search ranks at most this many of the newest matching posts
+    SEARCH_MAX_CANDIDATES: int = int(os.getenv("SEARCH_MAX_CANDIDATES", "10000"))
+
+    # Serialized first page of /auth/feed (0 disables the cache)
+    FEED_CACHE_TTL_SECONDS: float = float(os.getenv("FEED_CACHE_TTL_SECONDS", "5"))
+
+    # Bulk user import (/auth/admin/users/import; the CLI takes --workers, default CPU count)
+    BULK_IMPORT_WORKERS: int = int(os.getenv("BULK_IMPORT_WORKERS", str(min(os.cpu_count() or 1, 4))))
+    BULK_IMPORT_MAX_ROWS: int = int(os.getenv("BULK_IMPORT_MAX_ROWS", "50000"))
+
+    # Rate limiting ("sqlite" shares counters between workers on one host, "memory" is per process)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "sqlite")
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "")
+    RATE_LIMIT_LOGIN: str = os.getenv("RATE_LIMIT_LOGIN", "5/minute")
+    RATE_LIMIT_REGISTER: str = os.getenv("RATE_LIMIT_REGISTER", "10/hour")
+    RATE_LIMIT_POST_UPLOAD: str = os.getenv("RATE_LIMIT_POST_UPLOAD", "30/minute")
+
+    # Login lockout per account and per IP, before any password hashing
+    LOGIN_GUARD_SIZE: int = int(os.getenv("LOGIN_GUARD_SIZE", "100000"))
+    LOGIN_GUARD_WINDOW_SECONDS: float = float(os.getenv("LOGIN_GUARD_WINDOW_SECONDS", "3600"))
+    LOGIN_GUARD_ACCOUNT_FREE_ATTEMPTS: int = int(os.getenv("LOGIN_GUARD_ACCOUNT_FREE_ATTEMPTS", "3"))
+    LOGIN_GUARD_IP_FREE_ATTEMPTS: int = int(os.getenv("LOGIN_GUARD_IP_FREE_ATTEMPTS", "20"))
+    LOGIN_GUARD_BASE_DELAY_SECONDS: float = float(os.getenv("LOGIN_GUARD_BASE_DELAY_SECONDS", "1"))
+    LOGIN_GUARD_MAX_DELAY_SECONDS: float = float(os.getenv("LOGIN_GUARD_MAX_DELAY_SECONDS", "900"))
+
+    # Per-request query tracking (Server-Timing header and query logs)
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    QUERY_LOG_THRESHOLD: int = int(os.getenv("QUERY_LOG_THRESHOLD", "10"))
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Log DATABASE_URL status (without exposing the full URL)
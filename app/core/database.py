@@ -1,6 +1,14 @@
-from sqlalchemy import create_engine, text
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from app.core.config import settings
+from app.middleware.metrics import metrics
 import os
 
 # SET UP DATABASE URL
@@ -13,59 +21,322 @@ except Exception as e:
 # Determine if we're using PostgreSQL or SQLite
 is_postgres = DATABASE_URL and (DATABASE_URL.startswith('postgresql://') or DATABASE_URL.startswith('postgres://'))
 
-# SQL ENGINE configuration
+# DEPLOYMENT PROFILES
+# Pool and driver settings per deployment, picked with DEPLOYMENT_PROFILE:
+# - serverless: one connection per instance, pinged on checkout because frozen
+#   instances come back to dropped connections; no server-side prepared
+#   statements, which transaction-mode poolers (Neon, PgBouncer) do not support
+# - server: long-running uvicorn workers; a real pool, connections recycled
+#   instead of pinged, statements prepared after 5 executions
+# - test: small pool, no durability
+@dataclass(frozen=True)
+class PoolProfile:
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int                   # seconds, -1 for never
+    pool_pre_ping: bool
+    prepare_threshold: int | None       # psycopg v3; None disables prepared statements
+    sqlite_pragmas: tuple
+
+POOL_PROFILES = {
+    "serverless": PoolProfile(
+        pool_size=1, max_overflow=0, pool_timeout=10, pool_recycle=300, pool_pre_ping=True,
+        prepare_threshold=None,
+        sqlite_pragmas=(("journal_mode", "WAL"), ("synchronous", "NORMAL"), ("busy_timeout", 5000)),
+    ),
+    "server": PoolProfile(
+        pool_size=10, max_overflow=10, pool_timeout=30, pool_recycle=1800, pool_pre_ping=False,
+        prepare_threshold=5,
+        sqlite_pragmas=(
+            ("journal_mode", "WAL"), ("synchronous", "NORMAL"), ("busy_timeout", 5000),
+            ("mmap_size", 268435456), ("cache_size", -65536), ("temp_store", "MEMORY"),
+        ),
+    ),
+    "test": PoolProfile(
+        pool_size=5, max_overflow=0, pool_timeout=5, pool_recycle=-1, pool_pre_ping=False,
+        prepare_threshold=None,
+        sqlite_pragmas=(("journal_mode", "WAL"), ("synchronous", "OFF"), ("busy_timeout", 5000)),
+    ),
+}
+
 try:
-    if is_postgres:
-        # PostgreSQL configuration (for Neon, Supabase, etc.)
-        # Neon requires SSL, so we ensure it's enabled
-        if 'sslmode' not in DATABASE_URL:
-            # Add SSL mode if not present
-            separator = '&' if '?' in DATABASE_URL else '?'
-            DATABASE_URL = f"{DATABASE_URL}{separator}sslmode=require"
-        
-        # Try to use psycopg (v3) first - pure Python, works better on Vercel
-        # Convert postgresql:// to postgresql+psycopg:// for psycopg v3
+    POOL_PROFILE = POOL_PROFILES[settings.DEPLOYMENT_PROFILE]
+except KeyError:
+    print(f"⚠️ Warning: Unknown DEPLOYMENT_PROFILE {settings.DEPLOYMENT_PROFILE!r}, using 'serverless'")
+    POOL_PROFILE = POOL_PROFILES["serverless"]
+
+# Pools that record how long each checkout waited for a connection
+class TimedCheckoutMixin:
+    def _do_get(self):
+        start = time.perf_counter()
         try:
-            import psycopg  # noqa: F401
-            # Use psycopg v3 (pure Python, works better on Vercel)
-            if DATABASE_URL.startswith('postgresql://'):
-                DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+psycopg://', 1)
-            elif DATABASE_URL.startswith('postgres://'):
-                DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql+psycopg://', 1)
-            print("✅ Using psycopg v3 driver (pure Python)")
-        except ImportError:
-            # Fallback to psycopg2 if psycopg v3 not available
+            return super()._do_get()
+        finally:
+            metrics.observe_segment("pool_wait", time.perf_counter() - start)
+
+class TimedQueuePool(TimedCheckoutMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(url, is_async=False, pool_size=None, profile=None):
+    """create_engine keyword arguments for `url` under the deployment profile"""
+    profile = profile or POOL_PROFILE
+    if ':memory:' in url:
+        return {}  # in-memory SQLite keeps its single-connection pool
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size or profile.pool_size,
+        "max_overflow": profile.max_overflow,
+        "pool_timeout": profile.pool_timeout,
+    }
+    if url.startswith('sqlite'):
+        if not is_async:
+            options["connect_args"] = {'check_same_thread': False}
+        return options
+    options["pool_pre_ping"] = profile.pool_pre_ping
+    options["pool_recycle"] = profile.pool_recycle
+    if 'psycopg' in url:
+        options["connect_args"] = {
+            "connect_timeout": 10,
+            "prepare_threshold": profile.prepare_threshold,
+        }
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in POOL_PROFILE.sqlite_pragmas:
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def configure_engine(engine):
+    """Apply the profile's SQLite pragmas to every new connection of `engine`"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+# ASYNC ENGINE configuration
+# Same database as the sync engine, reached through an asyncio driver so the
+# request handlers never block the event loop on a DB round trip.
+def get_async_database_url(url):
+    if url.startswith('sqlite+aiosqlite://'):
+        return url
+    if url.startswith('sqlite://'):
+        return url.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+    if url.startswith('postgresql+psycopg://'):
+        # psycopg v3 ships both the sync and the async driver
+        return url
+    return None
+
+# READ ENGINE configuration
+# Read-only routes get their own engine and pool so they never queue behind
+# writes for the primary's single serverless connection:
+# - DATABASE_READ_URL set: a Postgres read replica
+# - SQLite: a second, query-only pool on the same file; WAL lets readers run
+#   while a write is in progress
+# - otherwise: None, and reads share the primary engine
+def get_read_database_url(url):
+    if url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    if url.startswith('postgresql://'):
+        url = url.replace('postgresql://', 'postgresql+psycopg://', 1)
+    if url.startswith('postgresql+psycopg://') and 'sslmode' not in url:
+        url = f"{url}{'&' if '?' in url else '?'}sslmode=require"
+    return get_async_database_url(url)
+
+def set_sqlite_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+# LAZY ENGINES
+# Engines (and with them the database driver) are created on first use rather
+# than at import, so a serverless cold start that never touches the database,
+# or has not yet, does not pay for them. Read them as attributes of this
+# module (database.AsyncSessionLocal) at call time; the first access builds
+# all of them.
+ENGINE_NAMES = (
+    "engine", "SessionLocal", "ASYNC_DATABASE_URL", "async_engine",
+    "AsyncSessionLocal", "read_engine", "AsyncReadSessionLocal",
+)
+_engines_lock = threading.Lock()
+
+def _create_engines():
+    global DATABASE_URL, engine, SessionLocal, ASYNC_DATABASE_URL, async_engine
+    global AsyncSessionLocal, read_engine, AsyncReadSessionLocal
+    # SQL ENGINE configuration
+    try:
+        if is_postgres:
+            # PostgreSQL configuration (for Neon, Supabase, etc.)
+            # Neon requires SSL, so we ensure it's enabled
+            if 'sslmode' not in DATABASE_URL:
+                # Add SSL mode if not present
+                separator = '&' if '?' in DATABASE_URL else '?'
+                DATABASE_URL = f"{DATABASE_URL}{separator}sslmode=require"
+        
+            # Try to use psycopg (v3) first - pure Python, works better on Vercel
+            # Convert postgresql:// to postgresql+psycopg:// for psycopg v3
             try:
-                import psycopg2  # noqa: F401
-                print("✅ Using psycopg2 driver")
+                import psycopg  # noqa: F401
+                # Use psycopg v3 (pure Python, works better on Vercel)
+                if DATABASE_URL.startswith('postgresql://'):
+                    DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+psycopg://', 1)
+                elif DATABASE_URL.startswith('postgres://'):
+                    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql+psycopg://', 1)
+                print("✅ Using psycopg v3 driver (pure Python)")
             except ImportError:
-                print("⚠️ Warning: Neither psycopg nor psycopg2 found. Database may not work.")
-                raise ImportError("No PostgreSQL driver found. Install psycopg[binary] or psycopg2-binary")
+                # Fallback to psycopg2 if psycopg v3 not available
+                try:
+                    import psycopg2  # noqa: F401
+                    print("✅ Using psycopg2 driver")
+                except ImportError:
+                    print("⚠️ Warning: Neither psycopg nor psycopg2 found. Database may not work.")
+                    raise ImportError("No PostgreSQL driver found. Install psycopg[binary] or psycopg2-binary")
         
-        # For serverless, use connection pooling with smaller pool size
-        engine = create_engine(
-            DATABASE_URL,
-            pool_pre_ping=True,  # Verify connections before using
-            pool_recycle=300,    # Recycle connections after 5 minutes
-            pool_size=1,         # Small pool for serverless
-            max_overflow=0,      # No overflow for serverless
-            echo=False,
-            connect_args={
-                "connect_timeout": 10,  # 10 second timeout
-            } if 'psycopg' in DATABASE_URL else {}
-        )
-    else:
-        # SQLite configuration (for local development)
-        engine = create_engine(
-            DATABASE_URL,
-            connect_args={'check_same_thread': False}
-        )
-except Exception as e:
-    print(f"Error creating database engine: {e}")
-    # Create a dummy engine that will fail gracefully
-    engine = None
+            # Pool size, pre-ping and recycling come from the deployment profile
+            engine = configure_engine(create_engine(DATABASE_URL, echo=False, **engine_options(DATABASE_URL)))
+        else:
+            # SQLite configuration (for local development)
+            engine = configure_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
+    except Exception as e:
+        print(f"Error creating database engine: {e}")
+        # Create a dummy engine that will fail gracefully
+        engine = None
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
+
+    try:
+        ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL) if engine else None
+        if ASYNC_DATABASE_URL is None:
+            if engine is not None:
+                print("⚠️ Warning: No async driver for this DATABASE_URL. Install psycopg[binary] (Postgres) or aiosqlite (SQLite).")
+            async_engine = None
+        else:
+            async_engine = configure_engine(create_async_engine(
+                ASYNC_DATABASE_URL,
+                echo=False,
+                **engine_options(ASYNC_DATABASE_URL, is_async=True),
+            ))
+    except Exception as e:
+        print(f"Error creating async database engine: {e}")
+        async_engine = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    ) if async_engine else None
+
+    try:
+        if async_engine is None:
+            read_engine = None
+        elif settings.DATABASE_READ_URL:
+            READ_DATABASE_URL = get_read_database_url(settings.DATABASE_READ_URL)
+            read_engine = configure_engine(create_async_engine(
+                READ_DATABASE_URL,
+                echo=False,
+                **engine_options(READ_DATABASE_URL, is_async=True, pool_size=settings.DATABASE_READ_POOL_SIZE),
+            ))
+        elif not is_postgres and ':memory:' not in ASYNC_DATABASE_URL:
+            # The profile pragmas put the file in WAL mode, so these readers never block the writer
+            read_engine = configure_engine(create_async_engine(
+                ASYNC_DATABASE_URL,
+                **engine_options(ASYNC_DATABASE_URL, is_async=True, pool_size=settings.DATABASE_READ_POOL_SIZE),
+            ))
+            event.listen(read_engine.sync_engine, "connect", set_sqlite_query_only)
+        else:
+            read_engine = None
+    except Exception as e:
+        print(f"Error creating read database engine: {e}")
+        read_engine = None
+
+    AsyncReadSessionLocal = sessionmaker(
+        bind=read_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    ) if read_engine else None
+
+    for tracked in (engine, async_engine, read_engine):
+        if tracked is not None:
+            track_queries(getattr(tracked, "sync_engine", tracked))
+
+def init_engines():
+    """Create the engines if that has not happened yet"""
+    if "AsyncReadSessionLocal" not in globals():
+        with _engines_lock:
+            if "AsyncReadSessionLocal" not in globals():
+                _create_engines()
+
+def __getattr__(name):
+    if name in ENGINE_NAMES:
+        init_engines()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 Base = declarative_base()
 
+# QUERY TRACKING
+# Every statement is counted and timed against the QueryStats of the request
+# that issued it (set by QueryTimingMiddleware). Async sessions run their sync
+# core in a greenlet that shares the request's context, so both engines report.
+class QueryStats:
+    __slots__ = ("count", "total", "slowest", "slowest_statement", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+        self.statements = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total += seconds
+        self.statements[statement] += 1
+        if seconds > self.slowest:
+            self.slowest = seconds
+            self.slowest_statement = statement
+
+    def repeated(self, threshold):
+        """Statements run at least `threshold` times: the usual sign of an N+1 loop"""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+current_query_stats = ContextVar("current_query_stats", default=None)
+
+
+def track_queries(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        metrics.observe_segment("db", elapsed)
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+
+def pool_stats():
+    """Connections in use and idle per engine, for /metrics"""
+    stats = {}
+    for name, variable in (("sync", "engine"), ("primary", "async_engine"), ("read", "read_engine")):
+        pool_engine = globals().get(variable)   # never forces the engines into existence
+        if pool_engine is None:
+            continue
+        pool = getattr(pool_engine, "sync_engine", pool_engine).pool
+        if isinstance(pool, QueuePool):
+            stats[f"{name}_size"] = pool.size()
+            stats[f"{name}_checked_out"] = pool.checkedout()
+            stats[f"{name}_idle"] = pool.checkedin()
+            stats[f"{name}_overflow"] = max(pool.overflow(), 0)
+    return stats
+
@@ -1,20 +1,18 @@
 """
 Database initialization script
-Run this to initialize the database schema
+Run this to initialize (or upgrade) the database schema
 """
-from app.core.database import Base, engine
-from app.models.user import User
-from app.models.post import Post
+from app.core.database import engine
+from app.migrations.runner import upgrade
 
 def init_db():
-    """Initialize database tables"""
+    """Apply all pending schema migrations"""
     try:
-        Base.metadata.create_all(bind=engine, checkfirst=True)
-        print("Database tables created successfully!")
+        upgrade(engine)
+        print("Database schema is ready!")
     except Exception as e:
-        print(f"Error creating database tables: {e}")
+        print(f"Error migrating database: {e}")
         raise
 
 if __name__ == "__main__":
     init_db()
-
@@ -0,0 +1,22 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.utils.hashing import HashingQueueFull
+from app.middleware.rate_limit import RateLimitExceeded
+import math
+
+
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry shortly"},
+        headers={"Retry-After": str(settings.HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests"},
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+    )
@@ -0,0 +1,142 @@
+"""
+Request instrumentation and Prometheus text exposition
+
+MetricsMiddleware is a plain ASGI middleware: per request it reads the clock
+twice and bumps a few pre-allocated counters, labelled with the matched route
+template (e.g. /auth/post/{id}) rather than the raw path so label sets stay
+bounded. Hot-path segments (JWT decode, DB, bcrypt, serialization) are timed
+where they happen and recorded with `metrics.observe_segment`.
+
+Everything is rendered on demand by `/metrics` in the Prometheus text format.
+"""
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds; the last bucket is +Inf
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SEGMENT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self):
+        self.latency = {}       # (method, route) -> Histogram
+        self.responses = {}     # (method, route, status) -> count
+        self.segments = {}      # segment -> Histogram
+        self.in_flight = 0
+        self.collectors = {}    # prefix -> callable returning a stats dict
+
+    def observe_request(self, method, route, status, seconds):
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(REQUEST_BUCKETS)
+        histogram.observe(seconds)
+        status_key = (method, route, status)
+        self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def observe_segment(self, segment, seconds):
+        histogram = self.segments.get(segment)
+        if histogram is None:
+            histogram = self.segments[segment] = Histogram(SEGMENT_BUCKETS)
+        histogram.observe(seconds)
+
+    def register_collector(self, prefix, stats):
+        """Expose the numeric values of `stats()` as app_<prefix>_<key> gauges"""
+        self.collectors[prefix] = stats
+
+    def render(self):
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in self.latency.items():
+            labels = f'method="{method}",route="{escape_label(route)}"'
+            lines.extend(histogram.render("http_request_duration_seconds", labels))
+
+        lines += [
+            "# HELP http_responses_total Responses by route and status code",
+            "# TYPE http_responses_total counter",
+        ]
+        for (method, route, status), count in self.responses.items():
+            lines.append(f'http_responses_total{{method="{method}",route="{escape_label(route)}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP app_segment_duration_seconds Time spent in hot-path segments",
+            "# TYPE app_segment_duration_seconds histogram",
+        ]
+        for segment, histogram in self.segments.items():
+            lines.extend(histogram.render("app_segment_duration_seconds", f'segment="{segment}"'))
+
+        for prefix, stats in self.collectors.items():
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"app_{prefix}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        metrics.in_flight += 1
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            metrics.observe_request(scope["method"], route_path, status_code, time.perf_counter() - start)
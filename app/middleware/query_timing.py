@@ -0,0 +1,96 @@
+"""
+Per-request SQL query tracking
+
+QueryTimingMiddleware gives every request a fresh QueryStats (see
+app/core/database.py) and reports what it collected:
+
+- a Server-Timing header with the query count, total DB time, slowest query
+  and total handler time, readable in the browser's network panel
+- a log line when the request ran more than QUERY_LOG_THRESHOLD queries, had a
+  query slower than SLOW_QUERY_MS, or repeated one statement
+  N_PLUS_ONE_THRESHOLD times or more (the usual N+1 shape)
+
+The header is sent with the response start, so queries run while streaming a
+body (e.g. the user export) only show up in the log line.
+"""
+import re
+import time
+
+from app.core.config import settings
+from app.core.database import QueryStats, current_query_stats
+
+SERVER_TIMING_DB = re.compile(r'(?:^|,)\s*db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def format_statement(statement, width=200):
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= width else statement[:width] + "..."
+
+
+def server_timing(stats, elapsed):
+    return (
+        f'db;dur={stats.total * 1000:.2f};desc="{stats.count} queries", '
+        f"db-slowest;dur={stats.slowest * 1000:.2f}, "
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+
+
+def log_queries(method, path, stats, elapsed):
+    repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+    if (
+        stats.count <= settings.QUERY_LOG_THRESHOLD
+        and stats.slowest * 1000 < settings.SLOW_QUERY_MS
+        and not repeated
+    ):
+        return
+    print(
+        f"[queries] {method} {path}: {stats.count} queries in {stats.total * 1000:.1f}ms "
+        f"(request {elapsed * 1000:.1f}ms), slowest {stats.slowest * 1000:.1f}ms: "
+        f"{format_statement(stats.slowest_statement or '')}"
+    )
+    for statement, count in repeated:
+        print(f"[queries] possible N+1 in {method} {path}: {count}x {format_statement(statement)}")
+
+
+def assert_query_budget(response, max_queries):
+    """Fail when a response's Server-Timing header reports more than `max_queries`
+
+    For tests and benchmark scripts, with any HTTP client:
+        assert_query_budget(client.get("/auth/feed"), 1)
+    """
+    header = response.headers.get("server-timing", "")
+    match = SERVER_TIMING_DB.search(header)
+    if match is None:
+        raise AssertionError(f"No query count in Server-Timing header: {header!r}")
+    count = int(match.group(1))
+    if count > max_queries:
+        raise AssertionError(
+            f"{response.request.method} {response.request.url.path} ran {count} queries, budget is {max_queries}"
+        )
+    return count
+
+
+class QueryTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING_ENABLED:
+                header = server_timing(stats, time.perf_counter() - start)
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            log_queries(scope["method"], scope["path"], stats, time.perf_counter() - start)
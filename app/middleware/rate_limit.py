@@ -1,5 +1,212 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""
+Rate limiting
+GCRA (generic cell rate algorithm) limiter with one float of state per key: the
+"theoretical arrival time" (TAT) of the next request. A limit of N per period
+allows a burst of N and then one request every period / N, which behaves like
+a sliding window without storing individual hits.
 
-limiter = Limiter(key_func=get_remote_address)
+Backends:
+- "sqlite": a WAL-mode SQLite file shared by every worker process on the host,
+  so "5/minute" means 5 per minute per client, not 5 per worker
+- "memory": a dict in this process (tests, single worker)
 
+Usage, on an endpoint that takes a `request: Request` argument:
+    @limiter.limit(settings.RATE_LIMIT_LOGIN)
+"""
+import asyncio
+import functools
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+from fastapi import Request
+
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+LIMIT_FORMAT = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+PURGE_EVERY = 1000   # checks between sweeps of expired keys
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a client is over a route's limit"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_limit(limit: str):
+    """"5/minute" -> (5, 60.0)"""
+    match = LIMIT_FORMAT.match(limit)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '5/minute'")
+    return int(match.group(1)), float(PERIODS[match.group(2)])
+
+
+def gcra(tat, now, count, period):
+    """Return (allowed, new_tat, retry_after) for one request against a stored TAT"""
+    interval = period / count
+    new_tat = max(tat, now) + interval
+    if new_tat - now > period:
+        return False, tat, new_tat - period - now
+    return True, new_tat, 0.0
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def check(self, key, now, count, period):
+        with self._lock:
+            allowed, new_tat, retry_after = gcra(self._tats.get(key, now), now, count, period)
+            if allowed:
+                self._tats[key] = new_tat
+            self._checks += 1
+            if self._checks % PURGE_EVERY == 0:
+                # A TAT in the past carries no state: the key is back to a full burst
+                self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+        return allowed, retry_after
+
+    def keys(self):
+        return len(self._tats)
+
+    def reset(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class SQLiteBackend:
+    """Counters in a local SQLite file, safe across processes on one host
+
+    BEGIN IMMEDIATE takes the write lock before reading the TAT, so concurrent
+    workers checking the same key are serialized. The state is disposable, so
+    the file runs with synchronous=OFF: no fsync on the request path.
+
+    check() blocks for as long as another worker holds the lock (up to the
+    5s busy timeout), so the async path runs it in a worker thread.
+    """
+
+    blocking = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._checks = 0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+            self._local.conn = conn
+        return conn
+
+    def check(self, key, now, count, period):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limit WHERE key = ?", (key,)).fetchone()
+            allowed, new_tat, retry_after = gcra(row[0] if row else now, now, count, period)
+            if allowed:
+                conn.execute(
+                    "INSERT INTO rate_limit (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat),
+                )
+            self._checks += 1
+            if self._checks % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limit WHERE tat <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    def keys(self):
+        return self._connection().execute("SELECT COUNT(*) FROM rate_limit").fetchone()[0]
+
+    def reset(self):
+        self._connection().execute("DELETE FROM rate_limit")
+
+
+def get_remote_address(request: Request):
+    return request.client.host if request.client else "127.0.0.1"
+
+
+class Limiter:
+    def __init__(self, backend, key_func=get_remote_address, enabled=True):
+        self.backend = backend
+        self.key_func = key_func
+        self.enabled = enabled
+
+        # Metrics
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, scope, key, limit):
+        """Count one request by `key` against `limit` for `scope`; raise if over it"""
+        if not self.enabled:
+            return
+        count, period = parse_limit(limit)
+        # Wall clock, not monotonic: the TATs are shared between processes
+        allowed, retry_after = self.backend.check(f"{scope}:{key}", time.time(), count, period)
+        if not allowed:
+            self.rejected += 1
+            raise RateLimitExceeded(retry_after)
+        self.allowed += 1
+
+    async def hit_async(self, scope, key, limit):
+        """hit() for the event loop: a blocking backend runs in a worker thread"""
+        if not self.enabled:
+            return
+        if getattr(self.backend, "blocking", False):
+            await asyncio.to_thread(self.hit, scope, key, limit)
+        else:
+            self.hit(scope, key, limit)
+
+    def limit(self, limit: str):
+        """Decorator for an async endpoint that takes a `request: Request` argument"""
+        parse_limit(limit)  # fail at import time on a malformed limit
+
+        def decorator(func):
+            scope = func.__name__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request")
+                if not isinstance(request, Request):
+                    request = next(arg for arg in args if isinstance(arg, Request))
+                await self.hit_async(scope, self.key_func(request), limit)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def create_backend(kind=None, path=None):
+    kind = kind or settings.RATE_LIMIT_BACKEND
+    if kind == "sqlite":
+        return SQLiteBackend(path or settings.RATE_LIMIT_SQLITE_PATH or os.path.join(tempfile.gettempdir(), "auth-rate-limit.db"))
+    if kind == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {kind}")
+
+
+limiter = Limiter(create_backend(), enabled=settings.RATE_LIMIT_ENABLED)
@@ -0,0 +1,42 @@
+"""
+Read-your-writes routing
+
+After a successful write (any non-GET request answered below 400) the client
+gets a short-lived `primary_until` cookie. While it is valid, get_read_db sends
+that client's reads to the primary instead of the read engine, so a replica
+that is a little behind never hides the client's own changes. The cookie lives
+on the client, so this works across workers without shared state; forging it
+only sends reads to the primary.
+"""
+import time
+
+from app.core.config import settings
+
+COOKIE_NAME = "primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def wrote_recently(request):
+    try:
+        return float(request.cookies.get(COOKIE_NAME, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or settings.READ_YOUR_WRITES_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                seconds = settings.READ_YOUR_WRITES_SECONDS
+                cookie = f"{COOKIE_NAME}={time.time() + seconds:.3f}; Max-Age={int(seconds) + 1}; Path=/; HttpOnly; SameSite=lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
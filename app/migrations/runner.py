@@ -0,0 +1,203 @@
+"""
+Schema migration runner
+Applies the numbered migrations in app/migrations/versions in order and records
+each one in the schema_version table. Works on SQLite and PostgreSQL.
+
+Run it as a deploy step, before the new code starts serving; the app itself
+never runs DDL:
+    python -m app.migrations.runner upgrade
+    python -m app.migrations.runner status
+
+Migrations must be idempotent (IF NOT EXISTS, or check before altering):
+statements like CREATE INDEX CONCURRENTLY cannot run inside a transaction, so
+a migration that fails halfway is simply run again on the next deploy.
+"""
+import argparse
+import importlib
+import os
+import re
+import sys
+from dataclasses import dataclass
+
+from sqlalchemy import inspect, text
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), "versions")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+# Arbitrary constant so concurrent deploys on Postgres take turns
+ADVISORY_LOCK_ID = 726130
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    module: object
+
+
+class MigrationContext:
+    """What a migration's upgrade() gets: the engine plus dialect-aware helpers"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+
+    @property
+    def is_postgres(self):
+        return self.dialect == "postgresql"
+
+    def execute(self, sql, params=None):
+        with self.engine.begin() as conn:
+            return conn.execute(text(sql), params or {})
+
+    def table_exists(self, table):
+        return inspect(self.engine).has_table(table)
+
+    def column_exists(self, table, column):
+        return column in {col["name"] for col in inspect(self.engine).get_columns(table)}
+
+    def create_index(self, name, table, columns, using=None):
+        """Build an index without blocking writes where the backend supports it
+
+        `using` picks a Postgres index method (e.g. "gin"); columns may be expressions.
+        """
+        column_list = ", ".join(columns)
+        method = f" USING {using}" if using else ""
+        if self.is_postgres:
+            # CONCURRENTLY cannot run in a transaction block. A failed concurrent
+            # build leaves an INVALID index behind, so drop it before retrying.
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                invalid = conn.execute(text(
+                    "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ), {"name": name}).first()
+                if invalid:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                conn.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON "{table}"{method} ({column_list})'))
+        else:
+            # SQLite builds indexes in one short write transaction; readers keep going under WAL
+            self.execute(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({column_list})')
+
+    def add_foreign_key(self, name, table, column, ref_table, ref_column="id"):
+        """Add a Postgres foreign key without a long table lock
+
+        The constraint is added NOT VALID (new writes are checked, existing rows
+        are not scanned under the ACCESS EXCLUSIVE lock), then validated in its
+        own transaction, which only takes SHARE UPDATE EXCLUSIVE. SQLite cannot
+        add constraints to an existing table: declare the reference in ADD COLUMN.
+        """
+        state = self.execute(
+            "SELECT convalidated FROM pg_constraint WHERE conname = :name AND conrelid = CAST(:table AS regclass)",
+            {"name": name, "table": f'"{table}"'},
+        ).first()
+        if state is None:
+            self.execute(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT {name} '
+                f'FOREIGN KEY ({column}) REFERENCES "{ref_table}"({ref_column}) NOT VALID'
+            )
+        if state is None or not state[0]:
+            self.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {name}')
+
+    def update_in_batches(self, table, set_sql, where_sql="1 = 1", batch_size=1000):
+        """Run an UPDATE over `table` in id ranges, committing each range separately
+
+        Keeps every transaction short so row locks are held briefly instead of
+        for the whole table.
+        """
+        with self.engine.connect() as conn:
+            low, high = conn.execute(text(f'SELECT MIN(id), MAX(id) FROM "{table}"')).one()
+        if low is None:
+            return 0
+        updated = 0
+        for start in range(low, high + 1, batch_size):
+            result = self.execute(
+                f'UPDATE "{table}" SET {set_sql} WHERE id >= :start AND id < :end AND ({where_sql})',
+                {"start": start, "end": start + batch_size},
+            )
+            updated += result.rowcount or 0
+        return updated
+
+
+def discover_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(VERSIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        module = importlib.import_module(f"app.migrations.versions.{filename[:-3]}")
+        migrations.append(Migration(version=int(match.group(1)), name=match.group(2), module=module))
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration version numbers in app/migrations/versions")
+    return migrations
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA_VERSION_DDL))
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+
+def upgrade(engine, target=None):
+    """Apply every pending migration up to `target` (default: latest)"""
+    lock_conn = None
+    if engine.dialect.name == "postgresql":
+        lock_conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+    try:
+        done = applied_versions(engine)
+        context = MigrationContext(engine)
+        applied = []
+        for migration in discover_migrations():
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            print(f"Applying migration {migration.version:04d}_{migration.name}...")
+            migration.module.upgrade(context)
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+                    {"version": migration.version, "name": migration.name},
+                )
+            applied.append(migration.version)
+        if not applied:
+            print("Database schema is up to date.")
+        return applied
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+            lock_conn.close()
+
+
+def status(engine):
+    done = applied_versions(engine)
+    for migration in discover_migrations():
+        state = "applied" if migration.version in done else "pending"
+        print(f"{migration.version:04d}_{migration.name}: {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database schema migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=("upgrade", "status"))
+    parser.add_argument("--target", type=int, default=None, help="stop after this version")
+    args = parser.parse_args()
+
+    from app.core.database import engine
+    if engine is None:
+        print("Database engine not configured - check DATABASE_URL")
+        sys.exit(1)
+
+    if args.command == "status":
+        status(engine)
+    else:
+        upgrade(engine, target=args.target)
+
+
+if __name__ == "__main__":
+    main()
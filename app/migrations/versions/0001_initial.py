@@ -0,0 +1,32 @@
+"""
+Initial schema: user and post tables as first deployed
+Databases created by Base.metadata.create_all before migrations existed already
+have these tables, so they are only created when missing. Very old databases
+may lack user.role, which used to be added by migrate_db.py.
+"""
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+user = Table(
+    "user", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True, index=True),
+    Column("username", String(50), unique=True, nullable=False),
+    Column("email", String, unique=True, nullable=False),
+    Column("hashed_password", String(255), nullable=False),
+    Column("role", String(50), nullable=False),
+)
+
+post = Table(
+    "post", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("title", String(255), nullable=False),
+    Column("content", String(255), nullable=False),
+    Column("author", String(255), nullable=False),
+)
+
+
+def upgrade(ctx):
+    metadata.create_all(ctx.engine, checkfirst=True)
+    if not ctx.column_exists("user", "role"):
+        ctx.execute("""ALTER TABLE "user" ADD COLUMN role VARCHAR(50) DEFAULT 'user' NOT NULL""")
@@ -0,0 +1,37 @@
+"""
+Link posts to user.id
+Adds post.user_id (foreign key to user.id) and post.created_at, backfills them
+for existing rows in short batches, and builds the (user_id, id) index used to
+list a user's posts newest-first.
+"""
+
+
+def upgrade(ctx):
+    if not ctx.column_exists("post", "user_id"):
+        # Nullable with no default: a metadata-only change on both backends
+        if ctx.is_postgres:
+            ctx.execute("ALTER TABLE post ADD COLUMN user_id INTEGER")
+        else:
+            # SQLite only takes the foreign key as part of ADD COLUMN (and does not check old rows)
+            ctx.execute('ALTER TABLE post ADD COLUMN user_id INTEGER REFERENCES "user"(id)')
+    if ctx.is_postgres:
+        # Added NOT VALID, then validated separately, so writes are never blocked by a full scan
+        ctx.add_foreign_key("post_user_id_fkey", "post", "user_id", "user")
+
+    if not ctx.column_exists("post", "created_at"):
+        if ctx.is_postgres:
+            # Postgres 11+ stores a non-volatile default without rewriting the table
+            ctx.execute("ALTER TABLE post ADD COLUMN created_at TIMESTAMP NOT NULL DEFAULT now()")
+        else:
+            # SQLite only allows constant defaults in ADD COLUMN
+            ctx.execute("ALTER TABLE post ADD COLUMN created_at DATETIME")
+            ctx.update_in_batches("post", "created_at = CURRENT_TIMESTAMP", "created_at IS NULL")
+
+    # Match existing posts to their author by username; rows with no such user stay NULL
+    ctx.update_in_batches(
+        "post",
+        'user_id = (SELECT "user".id FROM "user" WHERE "user".username = post.author)',
+        "user_id IS NULL",
+    )
+
+    ctx.create_index("ix_post_user_id_id", "post", ["user_id", "id"])
@@ -0,0 +1,19 @@
+"""
+Shared token revocation table (REVOCATION_BACKEND=database)
+"""
+from sqlalchemy import BigInteger, Column, MetaData, String, Table
+
+metadata = MetaData()
+
+revoked_token = Table(
+    "revoked_token", metadata,
+    Column("jti", String(64), primary_key=True),
+    Column("expires_at", BigInteger, nullable=False),
+    Column("revoked_at", BigInteger, nullable=False),
+)
+
+
+def upgrade(ctx):
+    metadata.create_all(ctx.engine, checkfirst=True)
+    ctx.create_index("ix_revoked_token_expires_at", "revoked_token", ["expires_at"])
+    ctx.create_index("ix_revoked_token_revoked_at", "revoked_token", ["revoked_at"])
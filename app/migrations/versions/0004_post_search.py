@@ -0,0 +1,55 @@
+"""
+Full-text search over posts (/auth/posts/search)
+
+SQLite: an FTS5 index over post.title and post.content. It is an external
+content table (the text stays only in post), kept in step by triggers, so
+post_upload, delete_post and any other write path update it in the same
+transaction.
+
+Postgres: a GIN index over a weighted tsvector expression (title above
+content). The index follows the rows by itself, and an expression index needs
+no table rewrite, unlike a stored generated column. Queries must use the very
+same expression (POSTGRES_VECTOR in app/services/post_search.py) to hit it.
+"""
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', title), 'A') || "
+    "setweight(to_tsvector('english', content), 'B')"
+)
+
+SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(
+        title, content,
+        content='post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_fts_insert AFTER INSERT ON post BEGIN
+        INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS post_fts_delete AFTER DELETE ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    # Only the indexed columns: renames rewrite post.author and must not touch the index
+    """
+    CREATE TRIGGER IF NOT EXISTS post_fts_update AFTER UPDATE OF title, content ON post BEGIN
+        INSERT INTO post_fts(post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+)
+
+
+def upgrade(ctx):
+    if ctx.is_postgres:
+        ctx.create_index("ix_post_search", "post", [f"({POSTGRES_VECTOR})"], using="gin")
+        return
+
+    for statement in SQLITE_DDL:
+        ctx.execute(statement)
+    # Index the posts written before the triggers existed; safe to repeat
+    ctx.execute("INSERT INTO post_fts(post_fts) VALUES ('rebuild')")
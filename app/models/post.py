@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, func
 from app.core.database import Base
 
 class Post(Base):
@@ -6,4 +6,14 @@ class Post(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     content = Column(String(255), nullable=False)
+    # Username at the time of writing, kept in sync on rename for display
     author = Column(String(255), nullable=False)
+    # Nullable only for legacy rows whose author no longer matches a user
+    user_id = Column(Integer, ForeignKey("user.id"), nullable=True)
+    # default= as well: SQLite databases migrated in place have no column default
+    created_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
+
+    __table_args__ = (
+        # A user's posts newest-first; also serves plain user_id lookups
+        Index("ix_post_user_id_id", "user_id", "id"),
+    )
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_token"
+    jti = Column(String(64), primary_key=True)
+    # Unix timestamps: when the token stops being valid anyway, and when it was revoked
+    expires_at = Column(BigInteger, nullable=False, index=True)
+    revoked_at = Column(BigInteger, nullable=False, index=True)
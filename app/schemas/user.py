@@ -1,5 +1,6 @@
 from fastapi import HTTPException
-from pydantic import BaseModel, EmailStr,validator
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr,validator
 
 class UserBase(BaseModel):
     username: str
@@ -25,4 +26,35 @@ class UserUpdate(BaseModel):
     username: str | None = None
     email: EmailStr | None = None
     password: str | None = None
-    role: str | None = None
\ No newline at end of file
+    role: str | None = None
+
+
+# RESPONSE MODELS
+# from_attributes lets FastAPI validate the column-projected Rows the routes
+# return directly, with no ORM object in between.
+class PostOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    title: str
+    content: str
+    author: str
+    user_id: int | None
+    created_at: datetime
+
+class PostPage(BaseModel):
+    items: list[PostOut]
+    next_cursor: str | None
+
+class PostDetail(BaseModel):
+    post: PostOut
+
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    username: str
+    email: str
+    role: str
+
+class UserPage(BaseModel):
+    items: list[UserOut]
+    next_cursor: str | None
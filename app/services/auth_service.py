@@ -1,13 +1,17 @@
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt , JWTError
-from app.api.v1 import auth
+from jose import JWTError
 from datetime import datetime, timedelta
+import hashlib
+import time
+import uuid
 from app.core.config import settings
+from app.services.token_revocation import revocation_store
+from app.services.keyring import keyring
+from app.utils.cache import TTLCache
+from app.middleware.metrics import metrics
 
 #GET ENV
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
@@ -15,25 +19,119 @@ REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "type":"access"})
-    encoded_jwt = jwt.encode(to_encode,SECRET_KEY,  algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "type":"access", "jti": uuid.uuid4().hex})
+    encoded_jwt = keyring.encode(to_encode)
     return encoded_jwt
 
 def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type":"refresh"})
-    refresh_token = jwt.encode(to_encode,SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "type":"refresh", "jti": uuid.uuid4().hex})
+    refresh_token = keyring.encode(to_encode)
     return refresh_token
 
+# TOKEN ID
+# Tokens issued before the jti claim existed are identified by their hash
+def get_token_id(token: str, payload: dict):
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+# TOKEN FAMILY
+# Every token minted from one login shares a "fam" claim. Revoking the family
+# kills all of them at once, which is what refresh-token reuse detection needs.
+def new_token_family():
+    return uuid.uuid4().hex
+
+def get_family_id(payload: dict):
+    family = payload.get("fam")
+    return f"fam:{family}" if family else None
+
+def create_token_pair(user_id, family: str):
+    claims = {"sub": str(user_id), "fam": family}
+    return create_access_token(claims), create_refresh_token(claims)
+
+# DECODED TOKEN CACHE
+# A browser sends the same cookie on every request, so verified payloads are
+# kept by token digest until the token's own exp. Only the signature check is
+# skipped on a hit: revocation is still checked on every call. Payloads are
+# shared between requests and must not be modified.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=0)
+
+def verify_token(token: str):
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = keyring.decode(token)
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+    return payload
+
 # DECODE TOKEN
 def decode_token(token:str):
+    start = time.perf_counter()
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = verify_token(token)
     except JWTError:
         raise HTTPException(
             status_code=401,
             detail="Could not validate credentials",
         )
+    finally:
+        metrics.observe_segment("jwt_decode", time.perf_counter() - start)
+    if revocation_store.is_revoked(get_token_id(token, payload)) or revocation_store.is_revoked(get_family_id(payload)):
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+        )
+    return payload
+
+# decode_token() for async callers: a revocation that only another instance has
+# seen so far is found in the shared table (see RevocationStore.is_revoked_async)
+async def decode_token_async(token: str):
+    payload = decode_token(token)
+    if await revocation_store.is_revoked_async(get_token_id(token, payload), get_family_id(payload)):
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+        )
+    return payload
+
+# REVOKE TOKEN
+async def revoke_token(token: str, family: bool = False):
+    try:
+        payload = keyring.decode(token)
+    except JWTError:
+        return  # Already expired or never valid, nothing to revoke
+    await revocation_store.revoke(get_token_id(token, payload), payload["exp"])
+    if family:
+        await revoke_family(payload)
+
+async def revoke_family(payload: dict):
+    family = get_family_id(payload)
+    if family:
+        # Outlives every token the family could still have issued
+        expires = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        await revocation_store.revoke(family, expires.timestamp())
+
+# ROTATE REFRESH TOKEN
+# A refresh token can be exchanged exactly once. Presenting one that was already
+# exchanged means it leaked, so the whole family is revoked, including the
+# tokens the legitimate client holds. No password hashing, and at most one
+# write (the revocation row, with REVOCATION_BACKEND=database).
+async def rotate_refresh_token(token: str):
+    credentials_error = HTTPException(status_code=401, detail="Could not validate credentials")
+    try:
+        payload = keyring.decode(token)
+    except JWTError:
+        raise credentials_error
+    if payload.get("type") != "refresh" or not payload.get("sub"):
+        raise credentials_error
+    if await revocation_store.is_revoked_async(get_family_id(payload)):
+        raise credentials_error
+    if not await revocation_store.revoke(get_token_id(token, payload), payload["exp"]):
+        await revoke_family(payload)
+        print(f"Refresh token reuse detected for user {payload['sub']}, token family revoked")
+        raise credentials_error
+    # Tokens from before families existed start one now
+    return create_token_pair(payload["sub"], payload.get("fam") or new_token_family())
 
@@ -0,0 +1,83 @@
+"""
+Feed response cache
+
+The first page of /auth/feed is the same for every user until someone posts or
+deletes, so it is kept here already serialized together with a strong ETag.
+Polling clients that send the ETag back get a 304 without a query or a JSON
+encode. post_upload and delete_post invalidate the cache; the TTL bounds how
+long another worker's writes can go unseen.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class FeedPage:
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class FeedCache:
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._pages = {}        # limit -> FeedPage
+        self._version = 0       # bumped on every invalidation
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.rebuilds = 0
+        self.rebuild_total = 0.0
+        self.rebuild_last = 0.0
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self, limit):
+        page = self._pages.get(limit)
+        if page is None or page.expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return page
+
+    def store(self, limit, body: bytes, version, rebuild_seconds):
+        """Cache a freshly built page unless a write happened while it was built"""
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        page = FeedPage(body=body, etag=etag, expires_at=time.monotonic() + self.ttl)
+        with self._lock:
+            self.rebuilds += 1
+            self.rebuild_total += rebuild_seconds
+            self.rebuild_last = rebuild_seconds
+            if version == self._version and self.ttl > 0:
+                self._pages[limit] = page
+        return page
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._pages.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "pages": len(self._pages),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "rebuilds": self.rebuilds,
+            "rebuild_last_ms": round(self.rebuild_last * 1000, 3),
+            "rebuild_avg_ms": round(self.rebuild_total / self.rebuilds * 1000, 3) if self.rebuilds else 0.0,
+        }
+
+
+feed_cache = FeedCache(ttl=settings.FEED_CACHE_TTL_SECONDS)
@@ -0,0 +1,126 @@
+"""
+Cached database health for the readiness probe
+
+A background task runs `SELECT 1` on the async engine every
+HEALTH_CHECK_INTERVAL_SECONDS and keeps the outcome and its latency. Probes
+only read that snapshot, so they never open a connection, never wait on the
+pool and cost the same however often the load balancer calls them.
+
+A snapshot older than HEALTH_CHECK_MAX_STALENESS_SECONDS counts as not ready:
+a checker that is stuck or dead must not keep reporting the last good result.
+Where no startup event runs (serverless), a probe that finds no fresh snapshot
+starts one check in the background and answers from what it already has.
+"""
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core import database
+
+
+class HealthMonitor:
+    def __init__(self, interval=10.0, max_staleness=30.0, timeout=2.0):
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.timeout = timeout
+        self.status = "unknown"         # unknown | connected | error | engine_not_created
+        self.error = None
+        self.latency_ms = None
+        self.checked_at = None          # time.monotonic() of the last finished check
+        self._task = None
+        self._check_task = None
+
+        # Metrics
+        self.checks = 0
+        self.failures = 0
+
+    async def check(self):
+        """Run one database check and store its outcome"""
+        start = time.perf_counter()
+        try:
+            if database.async_engine is None:
+                status, error = "engine_not_created", "Database engine is None - check DATABASE_URL format"
+            else:
+                # The timeout covers waiting for a pooled connection as well
+                await asyncio.wait_for(self._select_one(), self.timeout)
+                status, error = "connected", None
+        except Exception as e:
+            # Only the exception type: messages can carry connection details
+            status, error = "error", type(e).__name__
+        self.latency_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.status, self.error = status, error
+        self.checked_at = time.monotonic()
+        self.checks += 1
+        if status != "connected":
+            self.failures += 1
+
+    async def _select_one(self):
+        async with database.async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def age(self):
+        return None if self.checked_at is None else time.monotonic() - self.checked_at
+
+    def is_ready(self):
+        age = self.age()
+        return self.status == "connected" and age is not None and age <= self.max_staleness
+
+    def snapshot(self):
+        """Latest outcome, refreshing it in the background if it is stale"""
+        age = self.age()
+        if self._task is None and (age is None or age > self.interval):
+            self._refresh_in_background()
+        return {
+            "status": self.status,
+            "error": self.error,
+            "latency_ms": self.latency_ms,
+            "age_seconds": None if age is None else round(age, 3),
+        }
+
+    async def first_check(self):
+        """Wait for a check if none has finished yet (bounded by the timeout)"""
+        if self.checked_at is None:
+            self._refresh_in_background()
+            await asyncio.shield(self._check_task)
+
+    def _refresh_in_background(self):
+        # At most one check in flight, however many probes arrive meanwhile
+        if self._check_task is None or self._check_task.done():
+            self._check_task = asyncio.get_running_loop().create_task(self.check())
+
+    async def _check_forever(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._check_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        age = self.age()
+        return {
+            "ready": int(self.is_ready()),
+            "checks": self.checks,
+            "failures": self.failures,
+            "latency_ms": self.latency_ms or 0.0,
+            "age_seconds": round(age, 3) if age is not None else -1,
+        }
+
+
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    max_staleness=settings.HEALTH_CHECK_MAX_STALENESS_SECONDS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+)
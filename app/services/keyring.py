@@ -0,0 +1,153 @@
+"""
+JWT signing keyring
+
+With ALGORITHM=ES256 or RS256, tokens are signed with JWT_PRIVATE_KEY and carry
+its `kid` in the header. The matching public key, together with any retired
+keys in JWT_VERIFY_KEYS, is published at /.well-known/jwks.json so other
+services can verify tokens locally without sharing a secret.
+
+Every key is parsed once, when the keyring is built. Verification picks the
+key object by `kid` and never touches PEM again.
+
+With ALGORITHM=HS256 (the default) tokens keep being signed with SECRET_KEY and
+no `kid`, and the JWKS is empty: a shared secret is never published.
+
+Rotating a key:
+    1. python -m app.services.keyring generate --algorithm ES256
+    2. move the current public key into JWT_VERIFY_KEYS ({"<old kid>": "<PEM>"})
+    3. set JWT_PRIVATE_KEY to the new private key and redeploy
+    4. drop the old key from JWT_VERIFY_KEYS once REFRESH_TOKEN_EXPIRE_DAYS have passed
+"""
+import argparse
+import base64
+import hashlib
+import json
+
+from jose import jwk, jwt
+from jose.exceptions import JWTError
+
+from app.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "RS256")
+# RFC 7638: the members that identify a public key, per key type
+THUMBPRINT_MEMBERS = {"EC": ("crv", "kty", "x", "y"), "RSA": ("e", "kty", "n")}
+
+
+def load_pem(value: str):
+    # Single-line env values often carry the PEM line breaks as literal "\n"
+    return value.replace("\\n", "\n").strip()
+
+
+def thumbprint(public_jwk: dict):
+    """RFC 7638 JWK thumbprint, used as the default kid"""
+    members = {name: public_jwk[name] for name in THUMBPRINT_MEMBERS[public_jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).rstrip(b"=").decode()
+
+
+def generate_private_key(algorithm: str):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"Cannot generate a key for {algorithm}")
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+class Keyring:
+    def __init__(self, algorithm="HS256", secret_key=None, private_key=None, key_id=None, verify_keys=None):
+        self.algorithm = algorithm
+        self._verify = {}       # kid -> parsed public key
+        self._jwks = []
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            # Symmetric: one shared secret, no kid, nothing to publish
+            self.kid = None
+            self._signing_key = jwk.construct(secret_key, algorithm)
+            self._legacy_key = self._signing_key
+        else:
+            if not private_key:
+                print(f"⚠️ Warning: ALGORITHM={algorithm} but JWT_PRIVATE_KEY is not set. "
+                      "Using a temporary key: tokens will not survive a restart or work across workers.")
+                private_key = generate_private_key(algorithm)
+            self._signing_key = jwk.construct(load_pem(private_key), algorithm)
+            self._legacy_key = None
+            self.kid = self._add_verify_key(self._signing_key.public_key(), key_id)
+            for kid, public_pem in (verify_keys or {}).items():
+                self._add_verify_key(jwk.construct(load_pem(public_pem), algorithm), kid)
+
+        self.jwks_body = json.dumps({"keys": self._jwks}, separators=(",", ":")).encode()
+        self.jwks_etag = '"' + hashlib.sha256(self.jwks_body).hexdigest()[:32] + '"'
+
+    def _add_verify_key(self, public_key, kid=None):
+        public_jwk = public_key.to_dict()
+        kid = kid or thumbprint(public_jwk)
+        self._verify[kid] = public_key
+        self._jwks.append({**public_jwk, "kid": kid, "use": "sig"})
+        return kid
+
+    @property
+    def kids(self):
+        return list(self._verify)
+
+    def encode(self, claims: dict):
+        headers = {"kid": self.kid} if self.kid else None
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=headers)
+
+    def decode(self, token: str):
+        """Verify signature and expiry; raise JWTError on any problem"""
+        if self._legacy_key is not None:
+            return jwt.decode(token, self._legacy_key, algorithms=[self.algorithm])
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._verify.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self):
+        return {"keys": self._jwks}
+
+
+def load_verify_keys(value: str):
+    if not value:
+        return {}
+    keys = json.loads(value)
+    if not isinstance(keys, dict):
+        raise ValueError('JWT_VERIFY_KEYS must be a JSON object like {"<kid>": "<public key PEM>"}')
+    return keys
+
+
+keyring = Keyring(
+    algorithm=settings.ALGORITHM,
+    secret_key=settings.SECRET_KEY,
+    private_key=settings.JWT_PRIVATE_KEY,
+    key_id=settings.JWT_KEY_ID or None,
+    verify_keys=load_verify_keys(settings.JWT_VERIFY_KEYS),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key")
+    parser.add_argument("command", choices=("generate",))
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="ES256")
+    args = parser.parse_args()
+
+    private_pem = generate_private_key(args.algorithm)
+    public_key = jwk.construct(private_pem, args.algorithm).public_key()
+    print(f"ALGORITHM={args.algorithm}")
+    print(f"JWT_KEY_ID={thumbprint(public_key.to_dict())}")
+    print("JWT_PRIVATE_KEY=" + private_pem.strip().replace("\n", "\\n"))
+    print("Public key (for JWT_VERIFY_KEYS after the next rotation):")
+    print(public_key.to_pem().decode().strip().replace("\n", "\\n"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Credential-stuffing shield for /auth/login
+
+Failed logins are counted per account (the submitted email, whether or not it
+exists) and per client IP. Once a key is past its free attempts it is locked
+out for an exponentially growing delay, and while it is locked login answers
+429 before the user lookup or any bcrypt work, so an attack costs us almost no
+CPU.
+
+Unknown emails are verified against a dummy hash with the same cost as a real
+one and get the same error as a wrong password, so response time and message
+do not reveal which accounts exist.
+
+State lives in two bounded LRU caches (app/utils/cache.py). Entries expire
+LOGIN_GUARD_WINDOW_SECONDS after the last failure, and the oldest entries are
+evicted first when a flood of keys fills a cache.
+"""
+import secrets
+import time
+
+from app.core.config import settings
+from app.middleware.rate_limit import RateLimitExceeded
+from app.utils.cache import TTLCache
+from app.utils.hashing import hashing_executor
+
+
+class LoginGuard:
+    def __init__(
+        self,
+        maxsize=100000,
+        window=3600.0,
+        account_free_attempts=3,
+        ip_free_attempts=20,
+        base_delay=1.0,
+        max_delay=900.0,
+    ):
+        self.window = window
+        self.account_free_attempts = account_free_attempts
+        self.ip_free_attempts = ip_free_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.accounts = TTLCache(maxsize, window)   # email -> (failures, locked_until)
+        self.ips = TTLCache(maxsize, window)        # ip -> (failures, locked_until)
+        self._dummy_hash = None
+
+        # Metrics
+        self.blocked = 0
+        self.dummy_verifications = 0
+
+    def delay(self, failures, free_attempts):
+        """Lockout after the latest failure: 0 within the free attempts, then doubling"""
+        if failures < free_attempts:
+            return 0.0
+        return min(self.base_delay * 2 ** (failures - free_attempts), self.max_delay)
+
+    def check(self, email, ip):
+        """Raise RateLimitExceeded if the account or the IP is locked out"""
+        now = time.monotonic()
+        retry_after = 0.0
+        for cache, key in ((self.accounts, email.lower()), (self.ips, ip)):
+            entry = cache.get(key)
+            if entry is not None and entry[1] > now:
+                retry_after = max(retry_after, entry[1] - now)
+        if retry_after:
+            self.blocked += 1
+            raise RateLimitExceeded(retry_after)
+
+    def _record(self, cache, key, free_attempts, now):
+        failures = (cache.get(key) or (0, 0.0))[0] + 1
+        cache.set(key, (failures, now + self.delay(failures, free_attempts)))
+
+    def record_failure(self, email, ip):
+        now = time.monotonic()
+        self._record(self.accounts, email.lower(), self.account_free_attempts, now)
+        self._record(self.ips, ip, self.ip_free_attempts, now)
+
+    def record_success(self, email):
+        # The IP keeps its count: one valid credential must not reset a stuffing run
+        self.accounts.pop(email.lower())
+
+    async def dummy_verify(self, password):
+        """Spend the same bcrypt time as a real verification, for unknown emails"""
+        if self._dummy_hash is None:
+            # Built on first use; a race only means hashing it twice
+            self._dummy_hash = await hashing_executor.hash(secrets.token_urlsafe(16))
+        self.dummy_verifications += 1
+        await hashing_executor.verify(password, self._dummy_hash)
+
+    def stats(self):
+        return {
+            "accounts": len(self.accounts),
+            "ips": len(self.ips),
+            "blocked": self.blocked,
+            "dummy_verifications": self.dummy_verifications,
+        }
+
+
+login_guard = LoginGuard(
+    maxsize=settings.LOGIN_GUARD_SIZE,
+    window=settings.LOGIN_GUARD_WINDOW_SECONDS,
+    account_free_attempts=settings.LOGIN_GUARD_ACCOUNT_FREE_ATTEMPTS,
+    ip_free_attempts=settings.LOGIN_GUARD_IP_FREE_ATTEMPTS,
+    base_delay=settings.LOGIN_GUARD_BASE_DELAY_SECONDS,
+    max_delay=settings.LOGIN_GUARD_MAX_DELAY_SECONDS,
+)
@@ -0,0 +1,100 @@
+"""
+Full-text search over post titles and content
+
+Backed by the index from migration 0004: FTS5 on SQLite, a GIN-indexed
+tsvector expression on Postgres. Hits are ranked (bm25 on SQLite, ts_rank on
+Postgres, title weighted above content) and paged with a (score, id) keyset
+cursor, so a page never re-ranks what came before it with OFFSET.
+
+Ranking costs one score per hit, so only the newest SEARCH_MAX_CANDIDATES
+hits are ranked: a word found in most posts still answers in milliseconds, by
+relevance within that recent window.
+
+Scores depend on corpus statistics: a post written between two page requests
+can shift the scores of later hits a little, the same trade-off as any ranked
+keyset pagination.
+"""
+import re
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import Float, column, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.middleware.metrics import metrics
+from app.models.post import Post
+from app.schemas.user import PostOut
+from app.utils.pagination import decode_rank_cursor, encode_rank_cursor
+
+MAX_TERMS = 8
+TERM = re.compile(r"\w+")
+
+# Must match migration 0004 character for character, or Postgres ignores the index
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', title), 'A') || "
+    "setweight(to_tsvector('english', content), 'B')"
+)
+
+POST_OUT_FIELDS = ", ".join(f"post.{name}" for name in PostOut.model_fields)
+
+# (id, score) of the newest hits; only the page that survives the LIMIT is joined to post.
+# FTS5 walks its doclists in rowid order, so bm25 runs for the candidates alone.
+SQLITE_HITS = """
+    SELECT rowid AS id, -bm25(post_fts, 10.0, 1.0) AS score
+    FROM post_fts
+    WHERE post_fts MATCH :query
+    ORDER BY rowid DESC LIMIT :candidates
+"""
+
+# ts_rank returns real: widened to double precision so the score that went out in a
+# cursor compares equal to itself when it comes back as a float8 parameter
+POSTGRES_HITS = f"""
+    SELECT id, CAST(ts_rank({POSTGRES_VECTOR}, query) AS double precision) AS score
+    FROM post, websearch_to_tsquery('english', :query) AS query
+    WHERE ({POSTGRES_VECTOR}) @@ query
+    ORDER BY id DESC LIMIT :candidates
+"""
+
+
+def fts5_query(q: str):
+    """User input -> FTS5 query matching every word, with no FTS5 syntax let through"""
+    terms = TERM.findall(q.lower())[:MAX_TERMS]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+async def search_posts(db, q: str, limit: int, cursor: str | None = None, candidates=None):
+    """One page of posts matching `q`, best match first: (rows, next_cursor)"""
+    is_postgres = db.bind.dialect.name == "postgresql"
+    query = q if is_postgres else fts5_query(q)
+    if not query:
+        return [], None
+
+    after = ""
+    params = {"query": query, "limit": limit + 1, "candidates": candidates or settings.SEARCH_MAX_CANDIDATES}
+    if cursor:
+        params["score"], params["key"] = decode_rank_cursor(cursor)
+        after = "WHERE score < :score OR (score = :score AND id < :key)"
+    sql = f"""
+        SELECT {POST_OUT_FIELDS}, hits.score FROM (
+            SELECT id, score FROM ({POSTGRES_HITS if is_postgres else SQLITE_HITS}) ranked
+            {after}
+            ORDER BY score DESC, id DESC LIMIT :limit
+        ) hits JOIN post ON post.id = hits.id
+        ORDER BY hits.score DESC, hits.id DESC
+    """
+    stmt = text(sql).columns(*(Post.__table__.c[name] for name in PostOut.model_fields), column("score", Float))
+
+    start = time.perf_counter()
+    try:
+        rows = (await db.execute(stmt, params)).all()
+    except OperationalError as e:
+        if "post_fts" not in str(e):
+            raise
+        raise HTTPException(status_code=503, detail="Search index missing: run python -m app.migrations.runner upgrade")
+    metrics.observe_segment("search", time.perf_counter() - start)
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_rank_cursor(rows[-1].score, rows[-1].id)
@@ -0,0 +1,227 @@
+"""
+Token revocation store
+
+Revoked tokens are tracked by their `jti` claim together with the token's `exp`,
+so an entry only has to live until the token would have expired anyway. Expired
+entries are swept from a min-heap as time moves on, which keeps memory flat no
+matter how long the process runs.
+
+Every authenticated request asks "is this token revoked?" and the answer is
+almost always no, so a Bloom filter answers that case without touching the
+revoked set. A hit in the filter falls through to the exact dict lookup.
+
+With REVOCATION_BACKEND=database revocations are also written to the
+`revoked_token` table and every worker pulls new rows into its own in-memory
+copy every REVOCATION_SYNC_SECONDS, so lookups never wait on the database.
+Where that background sync does not run (serverless), is_revoked_async() pulls
+on a filter miss once the last pull is older than REVOCATION_SYNC_SECONDS, so a
+token revoked by another instance is refused within that interval.
+"""
+import asyncio
+import hashlib
+import heapq
+import math
+import threading
+import time
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core import database
+from app.models.revoked_token import RevokedToken
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    def __init__(self, capacity=100_000, use_database=False, sync_interval=5.0):
+        self.capacity = capacity
+        self.use_database = use_database
+        self.sync_interval = sync_interval
+        self._expiry = {}       # jti -> exp (unix seconds)
+        self._heap = []         # (exp, jti), soonest expiry first
+        self._bloom = BloomFilter(capacity)
+        self._bloom_stale = 0   # expired keys still set in the filter
+        self._lock = threading.Lock()
+        self._last_sync = 0
+        self._sync_task = None
+        self._pull_task = None
+
+    # IN-MEMORY STATE
+    def _add_local(self, jti, exp):
+        """Return True if `jti` was not already revoked here"""
+        if exp <= time.time():
+            return False
+        with self._lock:
+            previous = self._expiry.get(jti)
+            if previous is not None and previous >= exp:
+                return False
+            self._expiry[jti] = exp
+            heapq.heappush(self._heap, (exp, jti))
+            self._bloom.add(jti)
+            if len(self._expiry) > self._bloom.capacity:
+                self._rebuild_bloom(self._bloom.capacity * 2)
+        return previous is None
+
+    def _rebuild_bloom(self, capacity):
+        bloom = BloomFilter(capacity)
+        for jti in self._expiry:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._bloom_stale = 0
+
+    def sweep(self, now=None):
+        """Drop every entry whose token has already expired"""
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                exp, jti = heapq.heappop(self._heap)
+                if self._expiry.get(jti) == exp:
+                    del self._expiry[jti]
+                    self._bloom_stale += 1
+            # Bloom filters cannot delete, so rebuild once expired keys dominate
+            if self._bloom_stale > max(len(self._expiry), self.capacity // 10):
+                self._rebuild_bloom(max(self.capacity, len(self._expiry) * 2))
+
+    def is_revoked(self, jti):
+        if not jti or jti not in self._bloom:
+            return False
+        exp = self._expiry.get(jti)
+        if exp is None:
+            return False
+        if exp <= time.time():
+            self.sweep()
+            return False
+        return True
+
+    async def is_revoked_async(self, *jtis):
+        """True if any of `jtis` is revoked, pulling from the shared table first if it is due"""
+        if any(self.is_revoked(jti) for jti in jtis):
+            return True
+        if not self._pull_due():
+            return False
+        await self.pull()
+        return any(self.is_revoked(jti) for jti in jtis)
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def stats(self):
+        return {
+            "revoked": len(self._expiry),
+            "bloom_capacity": self._bloom.capacity,
+            "backend": "database" if self.use_database else "memory",
+        }
+
+    # PUBLIC API
+    async def revoke(self, jti, exp):
+        """Revoke `jti` until `exp`; return True if this call was the first to revoke it
+
+        The return value lets refresh-token rotation claim a token exactly once,
+        across workers when the database backend is on.
+        """
+        exp = int(exp)
+        self.sweep()
+        first = self._add_local(jti, exp)
+        if self.use_database and database.AsyncSessionLocal is not None:
+            async with database.AsyncSessionLocal() as db:
+                db.add(RevokedToken(jti=jti, expires_at=exp, revoked_at=int(time.time())))
+                try:
+                    await db.commit()
+                    first = True
+                except IntegrityError:
+                    await db.rollback()  # Already revoked by another request
+                    first = False
+        return first
+
+    # SHARED TABLE SYNC
+    def _pull_due(self):
+        return (
+            self.use_database
+            and database.AsyncSessionLocal is not None
+            and time.time() - self._last_sync >= self.sync_interval
+        )
+
+    async def _pull(self, db):
+        now = int(time.time())
+        # Overlap the window so rows committed late by another worker are not missed
+        since = self._last_sync - int(self.sync_interval) - 1 if self._last_sync else 0
+        result = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                RevokedToken.revoked_at >= since,
+                RevokedToken.expires_at > now,
+            )
+        )
+        for jti, exp in result:
+            self._add_local(jti, exp)
+        self._last_sync = now
+
+    async def _pull_once(self):
+        async with database.AsyncSessionLocal() as db:
+            await self._pull(db)
+
+    async def pull(self):
+        """Pull revocations written by other workers, read-only"""
+        # At most one pull in flight, however many requests find it due meanwhile
+        if self._pull_task is None or self._pull_task.done():
+            self._pull_task = asyncio.get_running_loop().create_task(self._pull_once())
+        await asyncio.shield(self._pull_task)
+
+    async def sync(self):
+        """Pull revocations written by other workers and purge expired rows"""
+        self.sweep()
+        if not self.use_database or database.AsyncSessionLocal is None:
+            return
+        async with database.AsyncSessionLocal() as db:
+            await self._pull(db)
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= int(time.time())))
+            await db.commit()
+
+    async def _sync_forever(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self):
+        if self._sync_task is None:
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync_forever())
+
+    async def stop(self):
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+
+revocation_store = RevocationStore(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    use_database=settings.REVOCATION_BACKEND == "database",
+    sync_interval=settings.REVOCATION_SYNC_SECONDS,
+)
@@ -10,6 +10,25 @@ const getApiBase = () => {
 
 const API_BASE = getApiBase();
 
+// fetch() for authenticated endpoints: when the access token has expired,
+// exchange the refresh cookie once and retry instead of sending the user to login
+let refreshPromise = null;
+
+async function apiFetch(url, options = {}) {
+    options = { credentials: 'include', ...options };
+    const response = await fetch(url, options);
+    if (response.status !== 401) {
+        return response;
+    }
+    if (!refreshPromise) {
+        refreshPromise = fetch(`${API_BASE}/refresh`, { method: 'POST', credentials: 'include' })
+            .then(r => r.ok)
+            .catch(() => false)
+            .finally(() => { refreshPromise = null; });
+    }
+    return (await refreshPromise) ? fetch(url, options) : response;
+}
+
 // Toast Notification System
 class ToastManager {
     constructor() {
@@ -126,7 +145,7 @@ function hideError() {
 // Check authentication
 async function checkAuth() {
     try {
-        const response = await fetch(`${API_BASE}/feed`, {
+        const response = await apiFetch(`${API_BASE}/feed`, {
             credentials: 'include'
         });
         return response.ok;
@@ -226,15 +245,35 @@ if (document.getElementById('logoutBtn')) {
     });
 }
 
+// Current user ({id, username, role}), fetched once per page load
+let currentUserPromise = null;
+
+function getCurrentUser() {
+    if (!currentUserPromise) {
+        currentUserPromise = apiFetch(`${API_BASE}/me`, { credentials: 'include' })
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+    }
+    return currentUserPromise;
+}
+
 // Load and display posts
-async function loadPosts() {
+let feedCursor = null;
+
+async function loadPosts(append = false) {
     const container = document.getElementById('postsContainer');
     if (!container) return;
 
-    container.innerHTML = '<div class="loading">Loading posts...</div>';
+    if (!append) {
+        feedCursor = null;
+        container.innerHTML = '<div class="loading">Loading posts...</div>';
+    }
 
     try {
-        const response = await fetch(`${API_BASE}/feed`, {
+        const feedUrl = append && feedCursor
+            ? `${API_BASE}/feed?cursor=${encodeURIComponent(feedCursor)}`
+            : `${API_BASE}/feed`;
+        const response = await apiFetch(feedUrl, {
             credentials: 'include'
         });
 
@@ -247,9 +286,11 @@ async function loadPosts() {
             throw new Error('Failed to load posts');
         }
 
-        const posts = await response.json();
+        const page = await response.json();
+        const posts = page.items;
+        feedCursor = page.next_cursor;
 
-        if (posts.length === 0) {
+        if (posts.length === 0 && !append) {
             container.innerHTML = `
                 <div class="empty-state">
                     <h3>No posts yet</h3>
@@ -259,22 +300,11 @@ async function loadPosts() {
             return;
         }
 
-        // Get current user's posts to show delete button
-        let userPosts = [];
-        try {
-            const userPostsResponse = await fetch(`${API_BASE}/get-post`, {
-                credentials: 'include'
-            });
-            if (userPostsResponse.ok) {
-                userPosts = await userPostsResponse.json();
-                userPosts = userPosts.map(p => p.id);
-            }
-        } catch (error) {
-            console.error('Failed to get user posts');
-        }
+        // Delete button on the current user's own posts
+        const currentUser = await getCurrentUser();
 
-        container.innerHTML = posts.map(post => {
-            const canDelete = userPosts.includes(post.id);
+        const html = posts.map(post => {
+            const canDelete = currentUser !== null && post.user_id === currentUser.id;
             return `
             <div class="post-card" data-post-id="${post.id}">
                 <div class="post-header">
@@ -291,8 +321,22 @@ async function loadPosts() {
         `;
         }).join('');
 
+        const existingLoadMore = document.getElementById('loadMorePosts');
+        if (existingLoadMore) existingLoadMore.remove();
+        if (append) {
+            container.insertAdjacentHTML('beforeend', html);
+        } else {
+            container.innerHTML = html;
+        }
+        if (feedCursor) {
+            container.insertAdjacentHTML('beforeend',
+                '<button id="loadMorePosts" class="btn btn-secondary">Load more</button>');
+            document.getElementById('loadMorePosts').addEventListener('click', () => loadPosts(true));
+        }
+
         // Add delete event listeners
-        document.querySelectorAll('.delete-post').forEach(btn => {
+        document.querySelectorAll('.delete-post:not([data-bound])').forEach(btn => {
+            btn.setAttribute('data-bound', 'true');
             btn.addEventListener('click', async (e) => {
                 const postId = e.target.getAttribute('data-id');
                 if (confirm('Are you sure you want to delete this post?')) {
@@ -320,7 +364,7 @@ if (document.getElementById('postForm')) {
         const content = document.getElementById('postContent').value;
 
         try {
-            const response = await fetch(`${API_BASE}/post_upload`, {
+            const response = await apiFetch(`${API_BASE}/post_upload`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -350,7 +394,7 @@ if (document.getElementById('postForm')) {
 // Delete post
 async function deletePost(postId) {
     try {
-        const response = await fetch(`${API_BASE}/post/${postId}`, {
+        const response = await apiFetch(`${API_BASE}/post/${postId}`, {
             method: 'DELETE',
             credentials: 'include'
         });
@@ -384,7 +428,7 @@ if (document.getElementById('postsContainer')) {
     console.log('API Base URL:', API_BASE);
     loadPosts();
     // Refresh posts every 30 seconds
-    setInterval(loadPosts, 30000);
+    setInterval(() => loadPosts(), 30000);
 }
 
 // Admin Panel Functionality
@@ -414,7 +458,7 @@ if (document.getElementById('usersTableBody')) {
     
     // Refresh users button
     if (document.getElementById('refreshUsersBtn')) {
-        document.getElementById('refreshUsersBtn').addEventListener('click', loadUsers);
+        document.getElementById('refreshUsersBtn').addEventListener('click', () => loadUsers());
     }
     
     // Search user
@@ -437,19 +481,66 @@ if (document.getElementById('usersTableBody')) {
     }
 }
 
-// Load all users
-async function loadUsers() {
-    const tbody = document.getElementById('usersTableBody');
+// Load users, one page at a time
+let usersCursor = null;
+let loadedUsers = [];
+
+function userRow(user) {
+    return `
+            <tr>
+                <td>${user.id}</td>
+                <td><strong>${escapeHtml(user.username)}</strong></td>
+                <td>${escapeHtml(user.email)}</td>
+                <td><span class="badge ${user.role === 'admin' ? 'badge-danger' : 'badge-primary'}">${user.role}</span></td>
+                <td>
+                    <button class="btn btn-sm btn-secondary" onclick="fillUpdateForm('${escapeHtml(user.username)}')">Edit</button>
+                </td>
+            </tr>
+        `;
+}
+
+async function loadUserStats() {
     const statsContainer = document.getElementById('usersStats');
+    if (!statsContainer) return;
+
+    const response = await apiFetch(`${API_BASE}/admin/users/stats`, { credentials: 'include' });
+    if (!response.ok) return;
+    const stats = await response.json();
+
+    statsContainer.innerHTML = `
+            <div class="stat-card">
+                <div class="stat-value">${stats.total}</div>
+                <div class="stat-label">Total Users</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${stats.by_role.admin || 0}</div>
+                <div class="stat-label">Admins</div>
+            </div>
+            <div class="stat-card">
+                <div class="stat-value">${stats.by_role.user || 0}</div>
+                <div class="stat-label">Regular Users</div>
+            </div>
+        `;
+}
+
+async function loadUsers(append = false) {
+    const tbody = document.getElementById('usersTableBody');
+    const tableContainer = document.querySelector('.table-container');
     
     if (!tbody) return;
     
-    tbody.innerHTML = '<tr><td colspan="5" style="text-align: center; padding: 2rem;"><div class="loading-spinner"></div><p style="margin-top: 1rem;">Loading users...</p></td></tr>';
+    if (!append) {
+        usersCursor = null;
+        loadedUsers = [];
+        tbody.innerHTML = '<tr><td colspan="5" style="text-align: center; padding: 2rem;"><div class="loading-spinner"></div><p style="margin-top: 1rem;">Loading users...</p></td></tr>';
+        loadUserStats().catch(error => console.error('Error loading user stats:', error));
+    }
     
     try {
-        const response = await fetch(`${API_BASE}/admin/users`, {
-            credentials: 'include'
-        });
+        const usersUrl = append && usersCursor
+            ? `${API_BASE}/admin/users?cursor=${encodeURIComponent(usersCursor)}`
+            : `${API_BASE}/admin/users`;
+        const response = await apiFetch(usersUrl, { credentials: 'include' });
         
         if (response.status === 401 || response.status === 403) {
             window.location.href = '/login';
@@ -460,48 +551,32 @@ async function loadUsers() {
             throw new Error('Failed to load users');
         }
         
-        const users = await response.json();
-        
-        // Update stats
-        const totalUsers = users.length;
-        const adminCount = users.filter(u => u.role === 'admin').length;
-        const userCount = users.filter(u => u.role === 'user').length;
-        
-        statsContainer.innerHTML = `
-            <div class="stat-card">
-                <div class="stat-value">${totalUsers}</div>
-                <div class="stat-label">Total Users</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value">${adminCount}</div>
-                <div class="stat-label">Admins</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value">${userCount}</div>
-                <div class="stat-label">Regular Users</div>
-            </div>
-        `;
+        const page = await response.json();
+        const users = page.items;
+        usersCursor = page.next_cursor;
+        loadedUsers.push(...users);
         
-        if (users.length === 0) {
+        if (loadedUsers.length === 0) {
             tbody.innerHTML = '<tr><td colspan="5" style="text-align: center; padding: 2rem;">No users found</td></tr>';
             return;
         }
         
         // Desktop table
-        tbody.innerHTML = users.map(user => `
-            <tr>
-                <td>${user.id}</td>
-                <td><strong>${escapeHtml(user.username)}</strong></td>
-                <td>${escapeHtml(user.email)}</td>
-                <td><span class="badge ${user.role === 'admin' ? 'badge-danger' : 'badge-primary'}">${user.role}</span></td>
-                <td>
-                    <button class="btn btn-sm btn-secondary" onclick="fillUpdateForm('${escapeHtml(user.username)}')">Edit</button>
-                </td>
-            </tr>
-        `).join('');
+        const existingLoadMore = document.getElementById('loadMoreUsersRow');
+        if (existingLoadMore) existingLoadMore.remove();
+        if (append) {
+            tbody.insertAdjacentHTML('beforeend', users.map(userRow).join(''));
+        } else {
+            tbody.innerHTML = users.map(userRow).join('');
+        }
+        if (usersCursor) {
+            tbody.insertAdjacentHTML('beforeend',
+                '<tr id="loadMoreUsersRow"><td colspan="5" style="text-align: center;"><button id="loadMoreUsers" class="btn btn-sm btn-secondary">Load more</button></td></tr>');
+            document.getElementById('loadMoreUsers').addEventListener('click', () => loadUsers(true));
+        }
         
         // Mobile cards
-        updateMobileCards(users, tableContainer);
+        updateMobileCards(loadedUsers, tableContainer);
         
     } catch (error) {
         console.error('Error loading users:', error);
@@ -518,7 +593,7 @@ async function searchUser() {
     }
     
     try {
-        const response = await fetch(`${API_BASE}/admin/user/${encodeURIComponent(username)}`, {
+        const response = await apiFetch(`${API_BASE}/admin/user/${encodeURIComponent(username)}`, {
             credentials: 'include'
         });
         
@@ -604,7 +679,7 @@ async function updateUser(e) {
     }
     
     try {
-        const response = await fetch(`${API_BASE}/admin/update/${encodeURIComponent(username)}`, {
+        const response = await apiFetch(`${API_BASE}/admin/update/${encodeURIComponent(username)}`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -0,0 +1,111 @@
+"""
+Bcrypt hashing off the event loop
+
+Password hashing and verification are CPU-bound (hundreds of ms each), so the
+async routes hand them to a dedicated executor instead of running them inline.
+The executor has a bounded queue: when it is full new work is rejected straight
+away with HashingQueueFull, and the routes answer 503 with a Retry-After header
+instead of piling up behind a login burst.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_password
+from app.middleware.metrics import metrics
+
+
+class HashingQueueFull(Exception):
+    """Raised when the hashing executor already holds its maximum backlog"""
+
+
+class HashingExecutor:
+    def __init__(self, kind="thread", max_workers=2, max_queue=32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.pending = 0        # submitted and not finished (running + queued)
+        self.completed = 0
+        self.rejected = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _get_executor(self):
+        # Created lazily so importing the app never forks or spawns threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        # Spawned, never forked: the server has an event loop, pool threads and sockets
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="bcrypt",
+                        )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        # Only called from the event loop thread, so the counter needs no lock
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingQueueFull()
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.pending -= 1
+            self.completed += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            metrics.observe_segment("bcrypt", elapsed)
+
+    async def hash(self, password):
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password, hashed_password):
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    @property
+    def queue_depth(self):
+        return max(self.pending - self.max_workers, 0)
+
+    def metrics(self):
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_avg_ms": round(self.latency_total / self.completed * 1000, 3) if self.completed else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hashing_executor = HashingExecutor(
+    kind=settings.HASH_EXECUTOR,
+    max_workers=settings.HASH_WORKERS,
+    max_queue=settings.HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,52 @@
+"""
+Keyset (cursor) pagination
+
+Pages are fetched with `WHERE key < last_key ORDER BY key DESC LIMIT n` instead
+of OFFSET, so every page costs one index range scan no matter how deep the
+client has paged. The cursor handed back to the client is an opaque token
+wrapping the last key of the page.
+"""
+import base64
+from fastapi import HTTPException
+
+
+def encode_cursor(value: int) -> str:
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_rank_cursor(score: float, key: int) -> str:
+    """Cursor for results ordered by (score DESC, key DESC), such as search hits"""
+    return base64.urlsafe_b64encode(f"{score!r}:{key}".encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, key = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return float(score), int(key)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(db, stmt, key_column, limit: int, cursor: str | None = None, descending: bool = True):
+    """Run `stmt` one page at a time, returning (rows, next_cursor)"""
+    if cursor:
+        last_key = decode_cursor(cursor)
+        stmt = stmt.where(key_column < last_key if descending else key_column > last_key)
+    stmt = stmt.order_by(key_column.desc() if descending else key_column.asc()).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    # A single entity (select(Post)) comes back as objects, a column list as Rows
+    rows = result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], key_column.key))
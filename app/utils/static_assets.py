@@ -0,0 +1,185 @@
+"""
+In-memory static assets and HTML pages
+
+The pages in app/templates and the files in app/templates/static are read
+once, on the first request, together with a gzip variant (when it is smaller)
+and a strong ETag for each. Responses are then served from memory:
+
+- `If-None-Match` matching the ETag answers 304 with no body
+- `Accept-Encoding: gzip` gets the precompressed variant, never compressed per request
+- asset links in the pages are rewritten to `/static/<name>?v=<content hash>`;
+  a request carrying the current hash is cached for a year as immutable,
+  everything else must revalidate (cheap, thanks to the ETag)
+
+With STATIC_RELOAD=true (development) the files are re-read once they change
+on disk, checked at most once per second.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+from starlette.responses import Response
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+MIN_GZIP_SIZE = 256
+STATIC_LINK = re.compile(r"""(["'])/static/([^"'?#]+)\1""")
+
+
+class Asset:
+    def __init__(self, body, media_type):
+        digest = hashlib.sha256(body).hexdigest()
+        self.body = body
+        self.media_type = media_type
+        self.version = digest[:12]
+        self.etag = f'"{digest[:32]}"'
+        compressed = gzip.compress(body, compresslevel=9, mtime=0) if len(body) >= MIN_GZIP_SIZE else None
+        if compressed is not None and len(compressed) < len(body):
+            self.gzip_body = compressed
+            self.gzip_etag = f'"{digest[:32]}-gzip"'
+        else:
+            self.gzip_body = None
+            self.gzip_etag = None
+
+
+def accepts_gzip(accept_encoding):
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(if_none_match, etag):
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class StaticAssets:
+    def __init__(self, templates_dir, static_dir, reload=False):
+        self.templates_dir = templates_dir
+        self.static_dir = static_dir
+        self.reload = reload
+        self.pages = {}         # "index.html" -> Asset
+        self.files = {}         # "app.js" -> Asset
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.responses = 0
+        self.not_modified = 0
+        self.gzip_responses = 0
+        self.loads = 0
+
+    def _sources(self):
+        """(directory, name) of every page and static file, pages last"""
+        sources = []
+        if os.path.isdir(self.static_dir):
+            for root, _, names in os.walk(self.static_dir):
+                for name in names:
+                    sources.append((self.static_dir, os.path.relpath(os.path.join(root, name), self.static_dir)))
+        if os.path.isdir(self.templates_dir):
+            sources.extend((self.templates_dir, name) for name in os.listdir(self.templates_dir) if name.endswith(".html"))
+        return sources
+
+    def _current_signature(self):
+        return tuple(
+            (directory, name, os.stat(os.path.join(directory, name)).st_mtime_ns)
+            for directory, name in self._sources()
+        )
+
+    def load(self):
+        files, pages = {}, {}
+        for directory, name in self._sources():
+            with open(os.path.join(directory, name), "rb") as f:
+                body = f.read()
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if directory == self.static_dir:
+                files[name.replace(os.sep, "/")] = Asset(body, media_type)
+            else:
+                pages[name] = body
+
+        def versioned(match):
+            asset = files.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f"{match.group(1)}/static/{match.group(2)}?v={asset.version}{match.group(1)}"
+
+        self.files = files
+        self.pages = {
+            name: Asset(STATIC_LINK.sub(versioned, body.decode("utf-8")).encode("utf-8"), "text/html")
+            for name, body in pages.items()
+        }
+        self.loads += 1
+
+    def _ensure_loaded(self):
+        if self._signature is not None and not self.reload:
+            return
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked < 1.0:
+            return
+        with self._lock:
+            if self._signature is not None and now - self._checked < 1.0:
+                return
+            signature = self._current_signature()
+            if signature != self._signature:
+                self.load()
+                self._signature = signature
+            self._checked = now
+
+    def respond(self, request, asset, cache_control):
+        self.responses += 1
+        use_gzip = asset.gzip_body is not None and accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = asset.gzip_etag if use_gzip else asset.etag
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            self.gzip_responses += 1
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=asset.gzip_body, media_type=asset.media_type, headers=headers)
+        return Response(content=asset.body, media_type=asset.media_type, headers=headers)
+
+    def page(self, request, name):
+        """Response for a page in templates_dir, or None if there is no such page"""
+        self._ensure_loaded()
+        asset = self.pages.get(name)
+        if asset is None:
+            return None
+        return self.respond(request, asset, REVALIDATE)
+
+    def file(self, request, path):
+        """Response for a file in static_dir, or None if there is no such file"""
+        self._ensure_loaded()
+        asset = self.files.get(path)
+        if asset is None:
+            return None
+        immutable = request.query_params.get("v") == asset.version
+        return self.respond(request, asset, IMMUTABLE if immutable else REVALIDATE)
+
+    def stats(self):
+        return {
+            "pages": len(self.pages),
+            "files": len(self.files),
+            "bytes": sum(len(a.body) + len(a.gzip_body or b"") for a in (*self.pages.values(), *self.files.values())),
+            "responses": self.responses,
+            "not_modified": self.not_modified,
+            "gzip_responses": self.gzip_responses,
+            "loads": self.loads,
+        }
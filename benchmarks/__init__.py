@@ -0,0 +1,15 @@
+"""
+Benchmarks for the auth service
+Run a module with: python -m benchmarks.<name>
+
+    run          load test + micro-benchmarks, saved as JSON, optional baseline check
+    load         in-process load test of the API endpoints
+    micro        token and password hashing micro-benchmarks
+    compare      compare two result files against a regression threshold
+    query_budget per-endpoint SQL query budgets (exits 1 when one is exceeded)
+    rate_limit   rate limiter per-check overhead and cross-process accuracy
+    login_guard  CPU saved by the login lockout under a simulated credential-stuffing attack
+    cold_start   import time and first request of api/index.py (exits 1 over the budget)
+    serialization  10k-post feed: ORM objects + jsonable_encoder vs Rows + response models
+    search       full-text post search at 1M posts vs a LIKE scan, and the index trigger write cost
+"""
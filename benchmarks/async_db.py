@@ -0,0 +1,139 @@
+"""
+Sync vs async database path under concurrency
+
+Both handlers are `async def`, exactly like the routes in app/api/v1/auth.py.
+The first one runs a blocking SQLAlchemy Session (the old get_db path), the
+second one awaits an AsyncSession (the get_async_db path). Every query calls
+a `sleep_ms` SQL function to stand in for a remote Postgres round trip.
+
+The read-split pair replays a mixed workload (one write every --write-every
+requests) against the serverless primary pool of one connection: first with
+every query on the primary, then with reads on a separate read engine
+(get_read_db) and only the writes on the primary.
+
+Usage:
+    python -m benchmarks.async_db --requests 200 --concurrency 50 --latency-ms 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+
+def build_app(db_path, latency_ms, pool_size, read_pool_size=5):
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+        return ms
+
+    def register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep_ms", 1, sleep_ms)
+
+    # Both pools are sized to the concurrency so only the driver differs
+    sync_engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=pool_size, max_overflow=0)
+    event.listen(sync_engine, "connect", register_sleep)
+    event.listen(async_engine.sync_engine, "connect", register_sleep)
+
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    # The production Postgres primary pool, and a read engine with its own pool
+    primary_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=1, max_overflow=0)
+    read_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=read_pool_size, max_overflow=0)
+    event.listen(primary_engine.sync_engine, "connect", register_sleep)
+    event.listen(read_engine.sync_engine, "connect", register_sleep)
+    PrimarySession = sessionmaker(bind=primary_engine, class_=AsyncSession, expire_on_commit=False)
+    ReadSession = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    query = text("SELECT sleep_ms(:ms)")
+    app = FastAPI()
+
+    @app.get("/primary-only/{kind}")
+    async def primary_only_route(kind: str):
+        async with PrimarySession() as db:
+            return {"value": (await db.execute(query, {"ms": latency_ms})).scalar()}
+
+    @app.get("/read-split/{kind}")
+    async def read_split_route(kind: str):
+        async with (PrimarySession if kind == "write" else ReadSession)() as db:
+            return {"value": (await db.execute(query, {"ms": latency_ms})).scalar()}
+
+    @app.get("/sync")
+    async def sync_route(db: Session = Depends(get_sync_db)):
+        return {"value": db.execute(query, {"ms": latency_ms}).scalar()}
+
+    @app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        result = await db.execute(query, {"ms": latency_ms})
+        return {"value": result.scalar()}
+
+    return app, (sync_engine, async_engine, primary_engine, read_engine)
+
+
+async def run(app, path, requests, concurrency, write_every=0):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        def url(n):
+            if not write_every:
+                return path
+            return f"{path}/{'write' if n % write_every == 0 else 'read'}"
+
+        async def one(n):
+            async with semaphore:
+                response = await client.get(url(n))
+                response.raise_for_status()
+
+        await client.get(url(1))  # warm up the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(requests)))
+        return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--read-pool-size", type=int, default=5, help="connections in the read engine's pool")
+    parser.add_argument("--write-every", type=int, default=10, help="one write per this many requests")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engines = build_app(os.path.join(tmp, "bench.db"), args.latency_ms, args.concurrency, args.read_pool_size)
+        sync_engine, *async_engines = engines
+        try:
+            for path, write_every in (("/sync", 0), ("/async", 0), ("/primary-only", args.write_every), ("/read-split", args.write_every)):
+                elapsed = await run(app, path, args.requests, args.concurrency, write_every)
+                print(f"{path:<14} {args.requests} requests in {elapsed:.3f}s -> {args.requests / elapsed:,.1f} req/s")
+        finally:
+            sync_engine.dispose()
+            for engine in async_engines:
+                await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""
+Cold start of the Vercel entry point
+
+Starts a fresh interpreter per run, imports api/index.py the way Vercel does
+and sends one request, so every run pays the full cold start. Each run is made
+with `python -X importtime`; its stderr is parsed to show which modules the
+import time goes to. Exits with status 1 if the median import time goes over
+the budget.
+
+Usage:
+    python -m benchmarks.cold_start --runs 5 --budget-ms 1500
+    python -m benchmarks.cold_start --top 30      # longer module list
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Runs inside the fresh interpreter; prints its timings as one JSON line
+PROBE = """
+import json, time
+start = time.perf_counter()
+import api.index
+imported = time.perf_counter()
+
+import asyncio, httpx
+async def first_request():
+    transport = httpx.ASGITransport(app=api.index.handler)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold") as client:
+        return (await client.get("/health")).status_code
+status = asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_request_ms": (done - imported) * 1000, "status": status}))
+"""
+
+
+def parse_importtime(stderr):
+    """`-X importtime` lines -> {module: (self_us, cumulative_us)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def cold_start(root):
+    env = dict(os.environ)
+    env["VERCEL"] = "1"
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='auth-bench-'), 'cold.db')}"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=root, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"cold start failed:\n{completed.stderr[-2000:]}")
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(completed.stderr)
+
+
+def run_cold_start(runs=5, top=15):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = [cold_start(root) for _ in range(runs)]
+    import_ms = [timings["import_ms"] for timings, _ in results]
+    first_request_ms = [timings["first_request_ms"] for timings, _ in results]
+
+    # Per-module self time, median over the runs
+    self_ms = {}
+    for _, modules in results:
+        for name, (self_us, _) in modules.items():
+            self_ms.setdefault(name, []).append(self_us / 1000)
+    slowest = sorted(((statistics.median(v), name) for name, v in self_ms.items()), reverse=True)[:top]
+    cumulative = {name: cumulative_us / 1000 for name, (_, cumulative_us) in results[-1][1].items()}
+
+    report = {
+        "runs": runs,
+        "import_ms": round(statistics.median(import_ms), 1),
+        "first_request_ms": round(statistics.median(first_request_ms), 1),
+        "status": results[-1][0]["status"],
+        "modules_imported": len(results[-1][1]),
+        "top_level": {
+            name: round(cumulative[name], 1)
+            for name in ("fastapi", "sqlalchemy", "jose", "passlib", "app.api.v1.auth", "app.core.database")
+            if name in cumulative
+        },
+        "slowest_modules": [{"module": name, "self_ms": round(ms, 2)} for ms, name in slowest],
+    }
+
+    print(f"import api.index  median {report['import_ms']:>8.1f}ms  ({report['modules_imported']} modules)")
+    print(f"first request     median {report['first_request_ms']:>8.1f}ms  (HTTP {report['status']})")
+    print("cumulative import time:")
+    for name, ms in report["top_level"].items():
+        print(f"  {name:<24} {ms:>8.1f}ms")
+    print("slowest modules (self time):")
+    for entry in report["slowest_modules"]:
+        print(f"  {entry['module']:<48} {entry['self_ms']:>8.2f}ms")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="how many of the slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="maximum median import time")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    report = run_cold_start(args.runs, args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cold_start": report}, f, indent=2)
+    if report["import_ms"] > args.budget_ms:
+        print(f"OVER BUDGET import api.index took {report['import_ms']}ms (budget {args.budget_ms}ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import os
+import sqlite3
+import statistics
+import tempfile
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Latencies in seconds -> report dict in milliseconds"""
+    values = sorted(latency * 1000 for latency in latencies)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(values), 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+    }
+
+
+def use_temporary_sqlite(name="bench.db"):
+    """Point DATABASE_URL at a fresh SQLite file; call before importing app modules"""
+    path = os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), name)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def seed_database(path, users, posts, hashed_password):
+    """Bulk-insert users (user0..userN, user0 is admin) and posts straight through sqlite3"""
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        'INSERT INTO "user" (id, username, email, hashed_password, role) VALUES (?, ?, ?, ?, ?)',
+        (
+            (i + 1, f"user{i}", f"user{i}@bench.io", hashed_password, "admin" if i == 0 else "user")
+            for i in range(users)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO post (title, content, author, user_id, created_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+        ((f"title {i}", f"content {i}", f"user{i % users}", i % users + 1) for i in range(posts)),
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files
+
+Flags every load scenario or micro-benchmark whose p95 latency grew, or whose
+throughput dropped, by more than the threshold relative to the baseline, and
+exits with status 1 if there is any such regression.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json --threshold 0.2
+"""
+import argparse
+import json
+import sys
+
+# metric -> True when bigger is better
+METRICS = {
+    "p95_ms": False,
+    "rps": True,
+    "calls_per_second": True,
+}
+
+
+def compare(baseline, current, threshold=0.2):
+    """Return a list of human-readable regression lines"""
+    regressions = []
+    for section in ("load", "micro"):
+        for name, before in baseline.get(section, {}).items():
+            after = current.get(section, {}).get(name)
+            if after is None:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                if metric not in before or metric not in after or not before[metric]:
+                    continue
+                change = (after[metric] - before[metric]) / before[metric]
+                regressed = change < -threshold if higher_is_better else change > threshold
+                if regressed:
+                    regressions.append(
+                        f"{section}/{name} {metric}: {before[metric]} -> {after[metric]} ({change:+.1%})"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative change (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
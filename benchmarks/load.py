@@ -0,0 +1,154 @@
+"""
+In-process load test for the auth API
+
+Drives app.app:app through httpx's ASGI transport (no network, no server)
+against a freshly migrated and seeded SQLite database, one scenario at a time,
+and reports p50/p95/p99 latency and requests per second for each.
+
+The login rate limit is switched off so the numbers measure the app rather
+than the rate limiter rejecting requests. Scenarios that hash passwords (register,
+login) are bcrypt-bound and use --bcrypt-requests.
+
+Usage:
+    python -m benchmarks.load --concurrency 10 --requests 200 --bcrypt-requests 20
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from benchmarks.common import seed_database, summarize, use_temporary_sqlite
+
+PASSWORD = "bench-password"
+SCENARIOS = ("register", "login", "refresh", "feed", "get-post", "post_upload", "admin_users", "logout")
+BCRYPT_SCENARIOS = ("register", "login")
+
+
+class LoadTest:
+    def __init__(self, users=1000, posts=10000):
+        self.db_path = use_temporary_sqlite()
+
+        # App modules read DATABASE_URL at import time
+        import httpx
+        from app.app import app
+        from app.core.database import engine
+        from app.core.security import hash_password
+        from app.middleware.rate_limit import limiter
+        from app.migrations.runner import upgrade
+        from app.services.auth_service import create_token_pair, new_token_family
+
+        upgrade(engine)
+        seed_database(self.db_path, users, posts, hash_password(PASSWORD))
+        limiter.enabled = False
+
+        self.httpx = httpx
+        self.app = app
+        self.create_token_pair = create_token_pair
+        self.new_token_family = new_token_family
+        self.users = users
+        self.counter = itertools.count()
+
+    def client(self, user_id=None):
+        client = self.httpx.AsyncClient(
+            transport=self.httpx.ASGITransport(app=self.app),
+            base_url="http://bench",
+        )
+        if user_id is not None:
+            self.sign_in(client, user_id)
+        return client
+
+    def sign_in(self, client, user_id):
+        # Mint tokens directly so authenticated scenarios don't pay for bcrypt
+        access_token, refresh_token = self.create_token_pair(user_id, self.new_token_family())
+        client.cookies.set("access_token", access_token)
+        client.cookies.set("refresh_token", refresh_token)
+
+    async def request(self, scenario, client):
+        n = next(self.counter)
+        user_id = n % (self.users - 1) + 2   # any seeded non-admin user
+        if scenario == "register":
+            return await client.post("/auth/register", json={
+                "username": f"new{n}", "email": f"new{n}@bench.io", "password": PASSWORD, "role": "user",
+            })
+        if scenario == "login":
+            return await client.post("/auth/login", json={"email": f"user{user_id - 1}@bench.io", "password": PASSWORD})
+        if scenario == "refresh":
+            # Each client's cookie jar picks up the rotated refresh token
+            return await client.post("/auth/refresh")
+        if scenario == "feed":
+            return await client.get("/auth/feed")
+        if scenario == "get-post":
+            return await client.get("/auth/get-post")
+        if scenario == "post_upload":
+            return await client.post("/auth/post_upload", json={"title": f"bench {n}", "content": "load test"})
+        if scenario == "admin_users":
+            return await client.get("/auth/admin/users")
+        if scenario == "logout":
+            self.sign_in(client, user_id)
+            return await client.post("/auth/logout")
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    async def run_scenario(self, scenario, requests, concurrency):
+        user_id = 1 if scenario == "admin_users" else 2
+        clients = [self.client(user_id) for _ in range(concurrency)]
+        latencies = []
+        errors = 0
+        remaining = itertools.count()
+
+        async def worker(client):
+            nonlocal errors
+            while next(remaining) < requests:
+                start = time.perf_counter()
+                response = await self.request(scenario, client)
+                if response.status_code < 400:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        await self.request(scenario, clients[0])  # warm up caches and pools
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for client in clients))
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            await client.aclose()
+        return {"concurrency": concurrency, **summarize(latencies, elapsed, errors)}
+
+
+async def run_load(scenarios=SCENARIOS, requests=200, bcrypt_requests=20, concurrency=10, users=1000, posts=10000):
+    load_test = LoadTest(users=users, posts=posts)
+    results = {}
+    for scenario in scenarios:
+        count = bcrypt_requests if scenario in BCRYPT_SCENARIOS else requests
+        results[scenario] = await load_test.run_scenario(scenario, count, concurrency)
+        r = results[scenario]
+        print(f"{scenario:<12} {r['rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}ms  "
+              f"p95 {r['p95_ms']:>8.2f}ms  p99 {r['p99_ms']:>8.2f}ms  errors {r['errors']}")
+    return results
+
+
+def add_arguments(parser):
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--bcrypt-requests", type=int, default=20, help="requests for register/login")
+    parser.add_argument("--users", type=int, default=1000, help="seeded users")
+    parser.add_argument("--posts", type=int, default=10000, help="seeded posts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(
+        args.scenarios, args.requests, args.bcrypt_requests, args.concurrency, args.users, args.posts,
+    ))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"load": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
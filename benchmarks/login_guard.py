@@ -0,0 +1,95 @@
+"""
+CPU saved by the login guard under a simulated credential-stuffing attack
+
+Sends the same stream of wrong-password logins (a mix of existing and unknown
+emails, spread over a few client IPs) twice: once with the guard effectively
+off and once with the configured lockouts. For each run it reports how many
+bcrypt operations ran, the process CPU time and how many attempts were turned
+away before hashing.
+
+Usage:
+    python -m benchmarks.login_guard --attempts 60 --accounts 5 --ips 3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.load import LoadTest
+
+UNLIMITED = 10 ** 9
+
+
+async def attack(load_test, attempts, accounts, ips):
+    from app.services.login_guard import login_guard
+    from app.utils.hashing import hashing_executor
+
+    clients = [
+        load_test.httpx.AsyncClient(
+            transport=load_test.httpx.ASGITransport(app=load_test.app, client=(f"203.0.113.{i + 1}", 40000)),
+            base_url="http://bench",
+        )
+        for i in range(ips)
+    ]
+    login_guard.accounts.clear()
+    login_guard.ips.clear()
+    blocked_before = login_guard.blocked
+    hashes_before = hashing_executor.completed
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    statuses = {}
+    for n in range(attempts):
+        # Even accounts exist (user1, user2, ...), odd ones are unknown emails
+        account = n % accounts
+        email = f"user{account + 1}@bench.io" if account % 2 == 0 else f"nobody{account}@bench.io"
+        response = await clients[n % ips].post("/auth/login", json={"email": email, "password": f"guess-{n}"})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    result = {
+        "attempts": attempts,
+        "bcrypt_operations": hashing_executor.completed - hashes_before,
+        "blocked_before_hashing": login_guard.blocked - blocked_before,
+        "cpu_seconds": round(time.process_time() - cpu_start, 3),
+        "wall_seconds": round(time.perf_counter() - wall_start, 3),
+        "statuses": statuses,
+    }
+    for client in clients:
+        await client.aclose()
+    return result
+
+
+async def run_login_guard(attempts=60, accounts=5, ips=3):
+    load_test = LoadTest(users=max(accounts + 1, 10), posts=0)
+    from app.services.login_guard import login_guard
+
+    free_attempts = (login_guard.account_free_attempts, login_guard.ip_free_attempts)
+    login_guard.account_free_attempts = login_guard.ip_free_attempts = UNLIMITED
+    unguarded = await attack(load_test, attempts, accounts, ips)
+    login_guard.account_free_attempts, login_guard.ip_free_attempts = free_attempts
+    guarded = await attack(load_test, attempts, accounts, ips)
+
+    for name, r in (("unguarded", unguarded), ("guarded", guarded)):
+        print(f"{name:<10} bcrypt {r['bcrypt_operations']:>4}  blocked {r['blocked_before_hashing']:>4}  "
+              f"cpu {r['cpu_seconds']:>7.2f}s  wall {r['wall_seconds']:>7.2f}s  statuses {r['statuses']}")
+    saved = 1 - guarded["cpu_seconds"] / unguarded["cpu_seconds"] if unguarded["cpu_seconds"] else 0.0
+    print(f"CPU saved by the guard: {saved:.0%}")
+    return {"unguarded": unguarded, "guarded": guarded, "cpu_saved": round(saved, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=60)
+    parser.add_argument("--accounts", type=int, default=5, help="targeted emails, every other one unknown")
+    parser.add_argument("--ips", type=int, default=3, help="attacking client IPs")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_login_guard(args.attempts, args.accounts, args.ips))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"login_guard": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
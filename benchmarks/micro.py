@@ -0,0 +1,72 @@
+"""
+Micro-benchmarks for the token and password hot paths
+
+Times create_access_token, decode_token (with and without the decoded-token
+cache) and hash_password/verify_password in isolation and reports per-call
+latency percentiles and calls per second.
+
+Usage:
+    python -m benchmarks.micro --iterations 2000 --bcrypt-iterations 10
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import summarize
+
+
+def time_calls(fn, iterations):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies, elapsed)
+    result["calls_per_second"] = result.pop("rps")
+    del result["errors"]
+    return result
+
+
+def run_micro(iterations=2000, bcrypt_iterations=10):
+    from app.core.security import hash_password, verify_password
+    from app.services.auth_service import create_access_token, decode_token, token_cache
+
+    token = create_access_token({"sub": "1"})
+    hashed = hash_password("bench-password")
+    cases = {
+        "create_access_token": (lambda: create_access_token({"sub": "1"}), iterations),
+        "decode_token": (lambda: decode_token(token), iterations),
+        "decode_token_uncached": (lambda: (token_cache.clear(), decode_token(token)), iterations),
+        "hash_password": (lambda: hash_password("bench-password"), bcrypt_iterations),
+        "verify_password": (lambda: verify_password("bench-password", hashed), bcrypt_iterations),
+    }
+    results = {}
+    for name, (fn, count) in cases.items():
+        fn()  # warm up
+        results[name] = time_calls(fn, count)
+        r = results[name]
+        print(f"{name:<20} {r['calls_per_second']:>10.1f} calls/s  p50 {r['p50_ms']:>8.3f}ms  p99 {r['p99_ms']:>8.3f}ms")
+    return results
+
+
+def add_arguments(parser):
+    parser.add_argument("--iterations", type=int, default=2000, help="calls for the token functions")
+    parser.add_argument("--bcrypt-iterations", type=int, default=10, help="calls for hash/verify_password")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_micro(args.iterations, args.bcrypt_iterations)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"micro": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
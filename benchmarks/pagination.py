@@ -0,0 +1,95 @@
+"""
+Feed page latency vs table size
+
+Seeds a throwaway SQLite database with N posts and times one page of the
+keyset-paginated feed (first page, a page in the middle of the table and the
+last page) against the old unpaginated `SELECT * FROM post ORDER BY id DESC`.
+Per-page latency should stay flat as N grows; the full scan grows linearly.
+
+Usage:
+    python -m benchmarks.pagination --sizes 10000 100000 1000000 --limit 50
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.post import Post
+from app.models.user import User
+from app.utils.pagination import encode_cursor, paginate
+
+
+def seed(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO post (id, title, content, author) VALUES (?, ?, ?, ?)",
+        ((i, f"title {i}", f"content {i}", f"user{i % 100}") for i in range(1, rows + 1)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def bench_size(tmp, rows, limit, repeat, full_scan_max):
+    db_path = os.path.join(tmp, f"posts_{rows}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, Post.__table__])
+    seed(db_path, rows)
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as db:
+        async def page(cursor):
+            async def run():
+                db.expunge_all()
+                await paginate(db, select(Post), Post.id, limit, cursor)
+            return run
+
+        first = await timed(await page(None), repeat)
+        middle = await timed(await page(encode_cursor(rows // 2)), repeat)
+        last = await timed(await page(encode_cursor(limit + 1)), repeat)
+
+        full = None
+        if rows <= full_scan_max:
+            async def full_scan():
+                db.expunge_all()
+                result = await db.execute(select(Post).order_by(Post.id.desc()))
+                result.scalars().all()
+            full = await timed(full_scan, 1)
+
+    await engine.dispose()
+    full_text = f"{full:10.2f}ms" if full is not None else f"{'skipped':>12}"
+    print(f"{rows:>9,} rows | first {first:7.2f}ms | middle {middle:7.2f}ms | last {last:7.2f}ms | full .all() {full_text}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--full-scan-max", type=int, default=100_000,
+                        help="skip the unpaginated baseline above this many rows")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            await bench_size(tmp, rows, args.limit, args.repeat, args.full_scan_max)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""
+Per-endpoint SQL query budgets
+
+Calls each endpoint once against a small seeded database and checks the query
+count reported in its Server-Timing header (app/middleware/query_timing.py).
+The principal cache is cleared before every call so the budgets cover the
+cache-miss path. Exits with status 1 if any endpoint goes over its budget.
+
+Usage:
+    python -m benchmarks.query_budget
+"""
+import asyncio
+import sys
+
+from benchmarks.load import PASSWORD, LoadTest
+
+# (method, path, json body, signed-in user id, max queries)
+BUDGETS = (
+    ("POST", "/auth/register", {"username": "budget", "email": "budget@bench.io", "password": PASSWORD, "role": "user"}, None, 2),
+    ("POST", "/auth/login", {"email": "user1@bench.io", "password": PASSWORD}, None, 1),
+    ("POST", "/auth/refresh", None, 2, 1),
+    ("GET", "/auth/me", None, 2, 1),
+    ("POST", "/auth/post_upload", {"title": "budget", "content": "budget"}, 2, 2),
+    ("GET", "/auth/feed", None, 2, 2),
+    ("GET", "/auth/get-post", None, 2, 2),
+    ("GET", "/auth/posts/search?q=title", None, 2, 2),
+    ("GET", "/auth/post/2", None, 2, 2),
+    ("DELETE", "/auth/post/2", None, 2, 3),
+    ("GET", "/auth/admin/users", None, 1, 2),
+    ("GET", "/auth/admin/users/stats", None, 1, 2),
+    ("GET", "/auth/admin/user/user3", None, 1, 2),
+    ("POST", "/auth/admin/update/user3", {"email": "renamed@bench.io"}, 1, 3),
+    ("POST", "/auth/logout", None, 2, 0),
+)
+
+
+async def check_budgets():
+    load_test = LoadTest(users=10, posts=100)
+    from app.api.deps import principal_cache
+    from app.middleware.query_timing import assert_query_budget
+
+    failures = []
+    for method, path, body, user_id, budget in BUDGETS:
+        principal_cache.clear()
+        async with load_test.client(user_id) as client:
+            response = await client.request(method, path, json=body)
+        if response.status_code >= 400:
+            failures.append(f"{method} {path}: HTTP {response.status_code}")
+            continue
+        try:
+            count = assert_query_budget(response, budget)
+            print(f"{method:<6} {path:<32} {count} / {budget} queries")
+        except AssertionError as e:
+            failures.append(str(e))
+    return failures
+
+
+def main():
+    failures = asyncio.run(check_budgets())
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
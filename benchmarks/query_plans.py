@@ -0,0 +1,74 @@
+"""
+Query-plan check for the post lookups
+
+Builds the schema in an in-memory SQLite database with the migration runner, so
+the indexes checked are the ones a deploy creates. Then runs EXPLAIN QUERY PLAN
+on the statements behind /auth/get-post, /auth/post/{id} and /auth/feed, and
+fails if any of them sorts the post table or falls back to a full scan of it.
+The feed's first page is the exception: it walks the table in rowid order,
+newest first, and stops after LIMIT rows.
+
+Usage:
+    python -m benchmarks.query_plans
+"""
+import sys
+
+from sqlalchemy import create_engine, select, text
+
+from app.migrations.runner import upgrade
+from app.models.post import Post
+
+LIMIT = 50
+
+CHECKS = {
+    # name: (statement, text the plan must contain, whether a scan of post is allowed)
+    "get-post (user's posts newest first)": (
+        select(Post).where(Post.user_id == 1).order_by(Post.id.desc()).limit(LIMIT + 1),
+        "USING INDEX ix_post_user_id_id",
+        False,
+    ),
+    "get-post next page": (
+        select(Post).where(Post.user_id == 1, Post.id < 1000).order_by(Post.id.desc()).limit(LIMIT + 1),
+        "USING INDEX ix_post_user_id_id",
+        False,
+    ),
+    "post/{id}": (
+        select(Post).where(Post.id == 10, Post.user_id == 1),
+        "USING INTEGER PRIMARY KEY",
+        False,
+    ),
+    "feed first page": (
+        select(Post).order_by(Post.id.desc()).limit(LIMIT + 1),
+        "SCAN post",
+        True,
+    ),
+    "feed next page": (
+        select(Post).where(Post.id < 1000).order_by(Post.id.desc()).limit(LIMIT + 1),
+        "USING INTEGER PRIMARY KEY",
+        False,
+    ),
+}
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def main():
+    engine = create_engine("sqlite://")
+    upgrade(engine)
+    failed = False
+    with engine.connect() as conn:
+        for name, (stmt, expected, scan_allowed) in CHECKS.items():
+            plan = explain(conn, stmt)
+            ok = any(expected in step for step in plan) and not any(
+                "TEMP B-TREE" in step or (step.startswith("SCAN post") and not scan_allowed) for step in plan
+            )
+            failed |= not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name}: {' | '.join(plan)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Rate limiter overhead and cross-process accuracy
+
+Times Limiter.hit for each backend, both for one hot key and for many distinct
+keys, then starts several processes that hammer one key through a shared SQLite
+file and checks that exactly the configured number of requests got through.
+
+Usage:
+    python -m benchmarks.rate_limit --checks 20000 --processes 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import percentile
+
+LIMIT = "100/hour"
+
+
+def time_checks(limiter, checks, distinct_keys):
+    from app.middleware.rate_limit import RateLimitExceeded
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(checks):
+        key = f"10.0.{i // 256 % 256}.{i % 256}" if distinct_keys else "10.0.0.1"
+        t = time.perf_counter()
+        try:
+            limiter.hit("bench", key, LIMIT)
+        except RateLimitExceeded:
+            pass
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "checks": checks,
+        "rps": round(checks / elapsed, 2),
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 2),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 2),
+    }
+
+
+def hammer(path, attempts, results):
+    from app.middleware.rate_limit import Limiter, RateLimitExceeded, SQLiteBackend
+
+    limiter = Limiter(SQLiteBackend(path))
+    allowed = 0
+    for _ in range(attempts):
+        try:
+            limiter.hit("bench", "shared-client", LIMIT)
+            allowed += 1
+        except RateLimitExceeded:
+            pass
+    results.put(allowed)
+
+
+def run_rate_limit(checks=20000, processes=4):
+    from app.middleware.rate_limit import Limiter, MemoryBackend, SQLiteBackend
+
+    directory = tempfile.mkdtemp(prefix="auth-bench-")
+    results = {}
+    for name, backend in (
+        ("memory", MemoryBackend()),
+        ("sqlite", SQLiteBackend(os.path.join(directory, "overhead.db"))),
+    ):
+        limiter = Limiter(backend)
+        for distinct_keys in (False, True):
+            label = f"{name}_{'distinct_keys' if distinct_keys else 'one_key'}"
+            backend.reset()
+            results[label] = time_checks(limiter, checks, distinct_keys)
+            r = results[label]
+            print(f"{label:<22} mean {r['mean_us']:>8.2f}us  p99 {r['p99_us']:>8.2f}us  {r['rps']:>10.0f} checks/s")
+
+    # Every process tries the full limit; together they must not exceed it
+    path = os.path.join(directory, "shared.db")
+    limit_count = int(LIMIT.split("/")[0])
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=hammer, args=(path, limit_count, queue)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(queue.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    results["shared"] = {"processes": processes, "limit": limit_count, "allowed": allowed}
+    print(f"{processes} processes x {limit_count} attempts on one key: {allowed} allowed (limit {limit_count})")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_rate_limit(args.checks, args.processes)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rate_limit": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
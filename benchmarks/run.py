@@ -0,0 +1,59 @@
+"""
+Run the load test and the micro-benchmarks and save the results as JSON
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --output results.json --baseline previous.json --threshold 0.2
+
+With --baseline the run exits with status 1 if anything regressed by more
+than the threshold (see benchmarks.compare).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import load, micro
+from benchmarks.compare import compare
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load.add_arguments(parser)
+    micro.add_arguments(parser)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "load": asyncio.run(load.run_load(
+            args.scenarios, args.requests, args.bcrypt_requests, args.concurrency, args.users, args.posts,
+        )),
+        "micro": micro.run_micro(args.iterations, args.bcrypt_iterations),
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
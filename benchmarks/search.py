@@ -0,0 +1,149 @@
+"""
+Full-text post search at scale
+
+Seeds a throwaway SQLite database with N posts of Zipf-distributed words,
+builds the FTS5 index with migration 0004 and then times:
+
+- the index build over the existing rows
+- search_posts() for a common word, a rare word, two words, and the tenth page
+  of a common word (following next_cursor), with the default candidate window
+- the common word with every hit ranked (no candidate window)
+- the same common and rare words as `LIKE '%word%'`, the scan search would
+  cost without the index
+- bulk inserts with the sync triggers against plain inserts
+
+Usage:
+    python -m benchmarks.search --posts 1000000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations.runner import upgrade
+from app.services.post_search import search_posts
+
+VOCABULARY = 20000
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "ta", "vo", "shi", "den", "mar", "pol", "tek", "zu", "ber", "qui", "an")
+
+
+def make_words(count, rng):
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def make_posts(words, count, start_id, rng):
+    # Zipf: the word of rank r turns up about 1/r as often as the most common one
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    for i in range(start_id, start_id + count):
+        title = " ".join(rng.choices(words, cum_weights=cum_weights, k=5))
+        content = " ".join(rng.choices(words, cum_weights=cum_weights, k=25))
+        yield (i, title, content[:255], f"user{i % 100}")
+
+
+def insert_posts(conn, posts):
+    conn.executemany(
+        "INSERT INTO post (id, title, content, author, created_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+        posts,
+    )
+    conn.commit()
+
+
+async def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+async def run_search(posts, limit, repeat, like_max):
+    rng = random.Random(42)
+    words = make_words(VOCABULARY, rng)
+    common, rare = words[0], words[VOCABULARY // 2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "search.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        upgrade(engine, target=3)
+
+        start = time.perf_counter()
+        conn = sqlite3.connect(db_path)
+        insert_posts(conn, make_posts(words, posts, 1, rng))
+        print(f"seeded {posts:,} posts in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        upgrade(engine)
+        print(f"index build (migration 0004)  {time.perf_counter() - start:8.1f}s")
+        engine.dispose()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        Session = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+        async with Session() as db:
+            def search(q, pages=1, candidates=None):
+                async def run():
+                    cursor = None
+                    for _ in range(pages):
+                        _, cursor = await search_posts(db, q, limit, cursor, candidates)
+                return run
+
+            for label, q, pages, candidates in (
+                (f"common word '{common}'", common, 1, None),
+                (f"rare word '{rare}'", rare, 1, None),
+                ("two words", f"{common} {words[3]}", 1, None),
+                ("common word, 10 pages", common, 10, None),
+                ("common word, every hit ranked", common, 1, posts),
+            ):
+                print(f"search {label:<34} {await timed(search(q, pages, candidates), repeat):9.2f}ms")
+
+        await async_engine.dispose()
+
+        if posts <= like_max:
+            for label, word in (("common", common), ("rare", rare)):
+                start = time.perf_counter()
+                conn.execute(
+                    "SELECT id FROM post WHERE title LIKE ? OR content LIKE ? ORDER BY id DESC LIMIT ?",
+                    (f"%{word}%", f"%{word}%", limit),
+                ).fetchall()
+                print(f"LIKE scan {label:<31} {(time.perf_counter() - start) * 1000:9.2f}ms")
+
+        # Write overhead of the sync triggers, on top of the seeded table
+        batch = 10000
+        start = time.perf_counter()
+        insert_posts(conn, make_posts(words, batch, posts + 1, rng))
+        with_triggers = time.perf_counter() - start
+        for trigger in ("post_fts_insert", "post_fts_delete", "post_fts_update"):
+            conn.execute(f"DROP TRIGGER {trigger}")
+        start = time.perf_counter()
+        insert_posts(conn, make_posts(words, batch, posts + batch + 1, rng))
+        without_triggers = time.perf_counter() - start
+        conn.close()
+        print(f"insert {batch:,} posts: {with_triggers * 1000:.0f}ms with the index triggers, "
+              f"{without_triggers * 1000:.0f}ms without")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--like-max", type=int, default=1_000_000,
+                        help="skip the LIKE baseline above this many posts")
+    args = parser.parse_args()
+    asyncio.run(run_search(args.posts, args.limit, args.repeat, args.like_max))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Feed serialization: hydrated ORM objects vs column-projected Rows
+
+Loads a 10k-post feed page both ways and turns it into JSON bytes:
+
+    orm   select(Post) -> Post objects -> jsonable_encoder -> json.dumps (before)
+    rows  select(*POST_OUT_COLUMNS) -> Rows -> PostPage -> model_dump_json (after)
+
+For each it reports the median fetch and serialization time over the repeats
+and checks that both produce the same JSON.
+
+Usage:
+    python -m benchmarks.serialization --rows 10000 --repeats 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.load import LoadTest
+
+
+async def fetch_orm(db, rows):
+    from sqlalchemy import select
+    from app.models.post import Post
+
+    result = await db.execute(select(Post).order_by(Post.id.desc()).limit(rows))
+    return result.scalars().all()
+
+
+def serialize_orm(posts):
+    from fastapi.encoders import jsonable_encoder
+
+    return json.dumps(
+        jsonable_encoder({"items": posts, "next_cursor": None}),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+async def fetch_rows(db, rows):
+    from sqlalchemy import select
+    from app.api.v1.auth import POST_OUT_COLUMNS
+    from app.models.post import Post
+
+    result = await db.execute(select(*POST_OUT_COLUMNS).order_by(Post.id.desc()).limit(rows))
+    return result.all()
+
+
+def serialize_rows(posts):
+    from app.schemas.user import PostPage
+
+    return PostPage.model_validate({"items": posts, "next_cursor": None}).model_dump_json().encode("utf-8")
+
+
+async def measure(fetch, serialize, rows, repeats):
+    from app.core import database
+
+    fetch_ms, serialize_ms = [], []
+    for _ in range(repeats):
+        # A fresh session each time, so the ORM variant cannot reuse its identity map
+        async with database.AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            posts = await fetch(db, rows)
+            fetched = time.perf_counter()
+            body = serialize(posts)
+            done = time.perf_counter()
+        fetch_ms.append((fetched - start) * 1000)
+        serialize_ms.append((done - fetched) * 1000)
+    return {
+        "fetch_ms": round(statistics.median(fetch_ms), 2),
+        "serialize_ms": round(statistics.median(serialize_ms), 2),
+        "total_ms": round(statistics.median(f + s for f, s in zip(fetch_ms, serialize_ms)), 2),
+        "bytes": len(body),
+    }, body
+
+
+async def run_serialization(rows=10000, repeats=5):
+    LoadTest(users=10, posts=rows)
+
+    results = {}
+    bodies = {}
+    for name, fetch, serialize in (("orm", fetch_orm, serialize_orm), ("rows", fetch_rows, serialize_rows)):
+        results[name], bodies[name] = await measure(fetch, serialize, rows, repeats)
+        r = results[name]
+        print(f"{name:<5} fetch {r['fetch_ms']:>9.2f}ms  serialize {r['serialize_ms']:>9.2f}ms  "
+              f"total {r['total_ms']:>9.2f}ms  ({r['bytes']} bytes)")
+
+    results["same_json"] = json.loads(bodies["orm"]) == json.loads(bodies["rows"])
+    results["speedup"] = round(results["orm"]["total_ms"] / results["rows"]["total_ms"], 2)
+    print(f"speedup {results['speedup']}x, identical JSON: {results['same_json']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_serialization(args.rows, args.repeats))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"serialization": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run("app.app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Local development: bring the schema up to date before serving
+    from app.core.database_init import init_db
+    init_db()
+    uvicorn.run("app.app:app", host="0.0.0.0", port=8000, reload=True)
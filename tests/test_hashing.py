@@ -0,0 +1,21 @@
+import asyncio
+
+from app.core.security import verify_password
+from app.utils.hashing import HashingExecutor
+
+
+def test_process_executor_spawns_its_workers():
+    executor = HashingExecutor(kind="process", max_workers=1)
+    try:
+        assert executor._get_executor()._mp_context.get_start_method() == "spawn"
+    finally:
+        executor.shutdown()
+
+
+def test_process_executor_hashes():
+    executor = HashingExecutor(kind="process", max_workers=1)
+    try:
+        hashed = asyncio.run(executor.hash("secret"))
+    finally:
+        executor.shutdown()
+    assert verify_password("secret", hashed)
@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.database import Base
+from app.models.revoked_token import RevokedToken
+from app.services.token_revocation import RevocationStore
+
+
+def test_revocation_reaches_an_instance_that_has_not_synced(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'revoked.db'}")
+    monkeypatch.setattr(database, "AsyncSessionLocal", sessionmaker(bind=engine, class_=AsyncSession))
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[RevokedToken.__table__])
+        # Two instances with no background sync, as on serverless
+        first = RevocationStore(use_database=True, sync_interval=5)
+        second = RevocationStore(use_database=True, sync_interval=5)
+        exp = time.time() + 60
+
+        assert await first.revoke("old", exp)
+        assert await second.is_revoked_async("old")
+
+        # Pulled just now: a new revocation shows up once the interval has passed
+        assert await first.revoke("new", exp)
+        assert not await second.is_revoked_async("new")
+        second._last_sync -= 5
+        assert await second.is_revoked_async("new")
+        await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.user_import import import_users, parse_rows
+from app.models.user import User
+
+HEADER = "username,email,password,role\n"
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_csv_row_with_extra_fields_is_rejected():
+    rows = list(parse_rows(HEADER + "a,a@x.io,pw,user,surplus\n", "csv"))
+    assert rows == [(1, None, "unexpected extra columns")]
+
+
+def test_import_reports_extra_columns_per_row():
+    db = make_session()
+    data = HEADER + "a,a@x.io,pw,user\nb,b@x.io,pw,user,surplus,more\nc,c@x.io,pw,user\n"
+
+    report = import_users(data, "csv", db, workers=1)
+
+    assert report["summary"]["created"] == 2
+    assert report["errors"] == [{"row": 2, "error": "unexpected extra columns"}]
+    assert set(db.scalars(select(User.username))) == {"a", "c"}
+
+
+def test_unknown_keys_are_ignored():
+    db = make_session()
+    data = '{"username": "a", "email": "a@x.io", "password": "pw", "role": "user", "nickname": "x"}\n'
+
+    report = import_users(data, "ndjson", db, workers=1)
+
+    assert report["summary"]["created"] == 1
+    assert report["errors"] == []